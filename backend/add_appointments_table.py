@@ -21,33 +21,62 @@ MEETING STATUS VALUES:
 - "ended": Meeting finished, no one can join
 """
 
-from app import create_app, db
-from models import Appointment
-from sqlalchemy import inspect
+from flask import Flask
+from config import config
+from models import db, Appointment
+from sqlalchemy import text
 
-def table_exists(table_name):
-    """Check if a table already exists in the database"""
-    inspector = inspect(db.engine)
-    return table_name in inspector.get_table_names()
+
+def make_minimal_app(config_name='development'):
+    """
+    Build a bare Flask app with only SQLAlchemy registered
+    
+    db.create_all() only needs the model metadata - skipping create_app()
+    avoids loading blueprints, CORS, SocketIO and the AI/payment services.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config[config_name])
+    db.init_app(app)
+    return app
+
+def ensure_appointment_indexes():
+    """
+    Create the composite appointment indexes if they are missing
+    
+    Table creation does not add indexes to a table that already exists, so
+    older databases get them here. On PostgreSQL the index is built
+    CONCURRENTLY so re-runs never lock the table against writes.
+    """
+    for index in Appointment.__table__.indexes:
+        columns = ', '.join(column.name for column in index.columns)
+        if db.engine.dialect.name == 'postgresql':
+            # CONCURRENTLY cannot run inside a transaction block
+            with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+                conn.execute(text(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index.name} "
+                    f"ON appointments ({columns})"
+                ))
+        else:
+            with db.engine.begin() as conn:
+                conn.execute(text(
+                    f"CREATE INDEX IF NOT EXISTS {index.name} ON appointments ({columns})"
+                ))
+        print(f"✓ Index {index.name} ({columns}) ready")
 
 def add_appointments_table():
     """Create the appointments table if it doesn't exist"""
-    app = create_app('development')
+    app = make_minimal_app('development')
     
     with app.app_context():
         try:
-            # Check if table already exists
-            if table_exists('appointments'):
-                print("✓ 'appointments' table already exists")
-                print("  No migration needed")
-                return
-            
-            print("Creating 'appointments' table...")
+            print("Creating 'appointments' table (if missing)...")
             
-            # Create the appointments table
-            db.create_all()
+            # Only this table - checkfirst=True does the existence probe and
+            # the CREATE in one step instead of walking every model
+            Appointment.__table__.create(db.engine, checkfirst=True)
+            ensure_appointment_indexes()
             
-            print("✓ 'appointments' table created successfully!")
+            print("✓ 'appointments' table ready!")
             print("\nTable Structure:")
             print("  - id: Primary key")
             print("  - patient_id: Foreign key to users table")
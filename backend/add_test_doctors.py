@@ -1,6 +1,7 @@
 """
 Add test doctors to database for booking functionality
 """
+from werkzeug.security import generate_password_hash
 from app import create_app
 from models import db, User
 
@@ -53,31 +54,47 @@ with app.app_context():
             }
         ]
         
-        added_count = 0
+        # One IN-query for all phone numbers instead of a probe per doctor
+        existing_phones = {
+            u.phone_number for u in User.query.filter(
+                User.phone_number.in_([d['phone_number'] for d in test_doctors])
+            ).all()
+        }
         
-        for doc_data in test_doctors:
-            # Check if doctor already exists
-            existing = User.query.filter_by(phone_number=doc_data['phone_number']).first()
-            
-            if existing:
-                print(f"⏭️  Doctor {doc_data['full_name']} already exists")
-                continue
-            
-            # Create new doctor
-            doctor = User(
-                phone_number=doc_data['phone_number'],
-                full_name=doc_data['full_name'],
-                email=doc_data['email'],
-                role='doctor',
-                is_active=True
-            )
-            doctor.set_password(doc_data['password'])
-            
-            db.session.add(doctor)
-            added_count += 1
-            print(f"✅ Added: {doc_data['full_name']} (Phone: {doc_data['phone_number']})")
+        new_doctors = []
+        
+        # Password hashing is deliberately slow - hash each distinct
+        # password once (all test doctors share one) and reuse the result
+        password_hashes = {}
+        
+        # Nothing here needs pending doctors flushed before a query -
+        # skip the autoflush check while the batch is built
+        with db.session.no_autoflush:
+            for doc_data in test_doctors:
+                if doc_data['phone_number'] in existing_phones:
+                    print(f"⏭️  Doctor {doc_data['full_name']} already exists")
+                    continue
+                
+                # Create new doctor
+                doctor = User(
+                    phone_number=doc_data['phone_number'],
+                    full_name=doc_data['full_name'],
+                    email=doc_data['email'],
+                    role='doctor',
+                    is_active=True
+                )
+                password = doc_data['password']
+                if password not in password_hashes:
+                    password_hashes[password] = generate_password_hash(password)
+                doctor.password_hash = password_hashes[password]
+                
+                new_doctors.append(doctor)
+                print(f"✅ Added: {doc_data['full_name']} (Phone: {doc_data['phone_number']})")
+        
+        added_count = len(new_doctors)
         
         if added_count > 0:
+            db.session.add_all(new_doctors)
             db.session.commit()
             print(f"\n✅ Successfully added {added_count} doctors to database!")
             print("\n📋 Test Doctor Credentials:")
@@ -3,20 +3,43 @@ Admin utility script for common administrative tasks
 Use this for testing and development only
 """
 
+from itertools import groupby
 from app import create_app
 from models import db, User, Visit, PatientProfile
-from sqlalchemy import func
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
+
+# Built once on first use - the interactive menu calls these helpers repeatedly
+_app = None
+
+
+def _get_app():
+    """Return the shared Flask app, creating it on first call"""
+    global _app
+    if _app is None:
+        _app, _socketio = create_app('development')
+    return _app
+
 
 def list_users():
     """List all users by role"""
-    app = create_app('development')
-    with app.app_context():
+    with _get_app().app_context():
         print("\n" + "=" * 60)
         print("REGISTERED USERS")
         print("=" * 60)
         
-        for role in ['patient', 'doctor', 'lab']:
-            users = User.query.filter_by(role=role).all()
+        roles = ['patient', 'doctor', 'lab']
+        
+        # One query for all roles, only the columns we print (no ORM objects)
+        rows = db.session.execute(
+            select(User.id, User.full_name, User.phone_number, User.role)
+            .where(User.role.in_(roles))
+            .order_by(User.role, User.id)
+        ).all()
+        users_by_role = {role: list(group) for role, group in groupby(rows, key=lambda r: r.role)}
+        
+        for role in roles:
+            users = users_by_role.get(role, [])
             print(f"\n{role.upper()}S ({len(users)}):")
             for user in users:
                 print(f"  ID: {user.id} | {user.full_name} | {user.phone_number}")
@@ -24,19 +47,20 @@ def list_users():
 
 def list_visits():
     """List all visits with their status"""
-    app = create_app('development')
-    with app.app_context():
+    with _get_app().app_context():
         print("\n" + "=" * 60)
         print("ALL VISITS")
         print("=" * 60)
         
-        visits = Visit.query.order_by(Visit.created_at.desc()).all()
-        
-        if not visits:
-            print("\nNo visits found.")
-            return
+        # Eager-load patient and doctor (no per-row lazy loads) and stream rows
+        visits = Visit.query.options(
+            joinedload(Visit.patient_profile).joinedload(PatientProfile.user),
+            joinedload(Visit.doctor)
+        ).order_by(Visit.created_at.desc()).yield_per(200)
         
+        found = False
         for visit in visits:
+            found = True
             patient = visit.patient_profile.user
             doctor = visit.doctor.full_name if visit.doctor else "Unassigned"
             print(f"\nVisit ID: {visit.id}")
@@ -45,33 +69,37 @@ def list_visits():
             print(f"  Status: {visit.status}")
             print(f"  Symptoms: {visit.symptoms[:50]}...")
             print(f"  Created: {visit.created_at.strftime('%Y-%m-%d %H:%M')}")
+        
+        if not found:
+            print("\nNo visits found.")
 
 
 def assign_visit_to_doctor(visit_id, doctor_id):
     """Assign a visit to a doctor"""
-    app = create_app('development')
-    with app.app_context():
-        visit = Visit.query.get(visit_id)
+    with _get_app().app_context():
+        visit = db.session.get(Visit, visit_id)
         if not visit:
             print(f"✗ Visit {visit_id} not found")
             return
         
-        doctor = User.query.filter_by(id=doctor_id, role='doctor').first()
-        if not doctor:
+        # Only the name is used - no need to load the whole User row
+        doctor_name = db.session.execute(
+            select(User.full_name).where(User.id == doctor_id, User.role == 'doctor')
+        ).scalar_one_or_none()
+        if doctor_name is None:
             print(f"✗ Doctor {doctor_id} not found")
             return
         
         visit.doctor_id = doctor_id
         db.session.commit()
         
-        print(f"✓ Visit {visit_id} assigned to Dr. {doctor.full_name}")
+        print(f"✓ Visit {visit_id} assigned to Dr. {doctor_name}")
 
 
 def unassign_visit(visit_id):
     """Remove doctor assignment from a visit"""
-    app = create_app('development')
-    with app.app_context():
-        visit = Visit.query.get(visit_id)
+    with _get_app().app_context():
+        visit = db.session.get(Visit, visit_id)
         if not visit:
             print(f"✗ Visit {visit_id} not found")
             return
@@ -84,8 +112,7 @@ def unassign_visit(visit_id):
 
 def delete_all_data():
     """Delete all data from database (DANGEROUS - use for testing only)"""
-    app = create_app('development')
-    with app.app_context():
+    with _get_app().app_context():
         confirm = input("⚠ This will delete ALL data. Type 'DELETE' to confirm: ")
         if confirm != 'DELETE':
             print("Aborted.")
@@ -94,39 +121,61 @@ def delete_all_data():
         print("\nDeleting all data...")
         
         # Delete in correct order due to foreign keys
-        from models import Message, Prescription, TestReport, LabTest, Visit, PatientProfile, User
-        
-        Message.query.delete()
-        Prescription.query.delete()
-        TestReport.query.delete()
-        LabTest.query.delete()
-        Visit.query.delete()
-        PatientProfile.query.delete()
-        User.query.delete()
-        
-        db.session.commit()
+        tables = ['messages', 'prescriptions', 'test_reports', 'lab_tests',
+                  'visits', 'patient_profiles', 'users']
+        
+        try:
+            if db.engine.dialect.name == 'postgresql':
+                # TRUNCATE works at file level - no per-row deletes or FK checks
+                db.session.execute(db.text(
+                    f"TRUNCATE TABLE {', '.join(tables)} RESTART IDENTITY CASCADE"
+                ))
+            else:
+                # Unqualified DELETE lets SQLite use its truncate optimization
+                for table in tables:
+                    db.session.execute(db.text(f"DELETE FROM {table}"))
+            
+            # Single commit so the wipe is all-or-nothing
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
         
         print("✓ All data deleted")
 
 
 def show_stats():
     """Show database statistics"""
-    app = create_app('development')
-    with app.app_context():
+    with _get_app().app_context():
         print("\n" + "=" * 60)
         print("DATABASE STATISTICS")
         print("=" * 60)
         
+        # One scan per table using conditional aggregation (COUNT ... FILTER)
+        users = db.session.query(
+            func.count(User.id),
+            func.count(User.id).filter(User.role == 'patient'),
+            func.count(User.id).filter(User.role == 'doctor'),
+            func.count(User.id).filter(User.role == 'lab')
+        ).one()
+        
+        visits = db.session.query(
+            func.count(Visit.id),
+            func.count(Visit.id).filter(Visit.status == 'pending'),
+            func.count(Visit.id).filter(Visit.status == 'in_progress'),
+            func.count(Visit.id).filter(Visit.status == 'completed')
+        ).one()
+        
         stats = {
-            'Total Users': User.query.count(),
-            'Patients': User.query.filter_by(role='patient').count(),
-            'Doctors': User.query.filter_by(role='doctor').count(),
-            'Labs': User.query.filter_by(role='lab').count(),
-            'Total Visits': Visit.query.count(),
-            'Pending Visits': Visit.query.filter_by(status='pending').count(),
-            'In Progress Visits': Visit.query.filter_by(status='in_progress').count(),
-            'Completed Visits': Visit.query.filter_by(status='completed').count(),
-            'Lab Tests': db.session.query(func.count()).select_from(db.session.query(db.select(db.text('1')).select_from(db.text('lab_tests'))).subquery()).scalar() or 0
+            'Total Users': users[0],
+            'Patients': users[1],
+            'Doctors': users[2],
+            'Labs': users[3],
+            'Total Visits': visits[0],
+            'Pending Visits': visits[1],
+            'In Progress Visits': visits[2],
+            'Completed Visits': visits[3],
+            'Lab Tests': db.session.execute(db.text('SELECT COUNT(*) FROM lab_tests')).scalar() or 0
         }
         
         for key, value in stats.items():
@@ -1,38 +1,87 @@
+# Eventlet must patch the standard library before anything else imports sockets.
+# Greenlets let one process hold hundreds of long-lived signaling connections;
+# without eventlet installed we fall back to one OS thread per client.
+try:
+    import eventlet
+    eventlet.monkey_patch()
+    SOCKETIO_ASYNC_MODE = 'eventlet'
+except ImportError:
+    SOCKETIO_ASYNC_MODE = 'threading'
+
 from flask import Flask, jsonify, session, send_from_directory
 from flask_migrate import Migrate
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from config import config
 from models import db
+from utils.json_provider import OrjsonProvider, socketio_json
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
 import os
+import sqlite3
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+
+# Memory-map up to 64MB of the SQLite file (modest for small rural servers)
+SQLITE_MMAP_SIZE = 64 * 1024 * 1024
+
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Tune SQLite connections: WAL journaling (concurrent readers, fewer
+    fsyncs), in-memory temp tables/sorts and memory-mapped reads
+    """
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+        cursor.execute(f'PRAGMA mmap_size={SQLITE_MMAP_SIZE}')
+        cursor.close()
+
+
 def create_app(config_name='development'):
     """Application factory pattern"""
     app = Flask(__name__, 
                 static_folder='../frontend',
                 static_url_path='')
     
+    # orjson for jsonify() and request.get_json() (stdlib if not installed)
+    app.json = OrjsonProvider(app)
+    
     # Load configuration
     app.config.from_object(config[config_name])
     
-    # Enable CORS with credentials support for all origins (development)
-    CORS(app, supports_credentials=True, origins='*')
+    # psycopg2 waits for the server inside C code, which eventlet cannot
+    # switch away from - psycogreen makes those waits yield to other greenlets
+    if SOCKETIO_ASYNC_MODE == 'eventlet' and \
+            make_url(app.config['SQLALCHEMY_DATABASE_URI']).get_driver_name() == 'psycopg2':
+        try:
+            from psycogreen.eventlet import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            print("⚠️  Warning: psycogreen not installed - PostgreSQL queries will block the eventlet worker")
+    
+    # Enable CORS with credentials support for the configured origins
+    allowed_origins = list(app.config['ALLOWED_ORIGINS'])
+    CORS(app, supports_credentials=True, origins=allowed_origins)
     
     # Initialize extensions
     db.init_app(app)
     migrate = Migrate(app, db)
     
     # Initialize SocketIO for video consultation signaling
-    # Allow all origins for development (video calls can come from any client)
+    # Same allow-list as the REST API (set ALLOWED_ORIGINS for other clients)
     socketio = SocketIO(app, 
-                       cors_allowed_origins='*',
+                       cors_allowed_origins=allowed_origins,
                        logger=False, 
                        engineio_logger=False,
-                       async_mode='threading',
+                       async_mode=SOCKETIO_ASYNC_MODE,
+                       json=socketio_json,
                        ping_timeout=60,
                        ping_interval=25)
     
@@ -131,7 +180,7 @@ if __name__ == '__main__':
     print("="*60)
     print("Server is running. Press CTRL+C to stop.\n")
     
-    # Run with threading mode
+    # Eventlet serves natively (no Werkzeug); falls back to threading mode
     socketio.run(
         app,
         host='0.0.0.0',
@@ -1,24 +1,90 @@
+import json
+import sys
 from functools import wraps
-from flask import session, jsonify
-from typing import List, Callable, Any
+from flask import session, g, current_app
+from typing import List, Callable, Any, Optional, Tuple, FrozenSet
+
+
+def _error_body(message: str, **extra: Any) -> bytes:
+    """Serialize an error payload once (at import / decoration time)"""
+    return json.dumps({'status': 'error', 'message': message, **extra}).encode('utf-8')
+
+
+def _error_response(body: bytes, status: int) -> Any:
+    """Build a fresh JSON response from a pre-serialized body (no jsonify per reject)"""
+    return current_app.response_class(body, status=status, mimetype='application/json')
+
+
+# Rejection bodies that never change
+_AUTH_REQUIRED = _error_body('Authentication required')
+_AUTH_REQUIRED_CODED = _error_body('Unauthorized: Authentication required', code='AUTH_REQUIRED')
+_SESSION_INVALID = _error_body('Unauthorized: Session invalid', code='SESSION_INVALID')
+
+
+def _get_auth() -> Tuple[Optional[int], Optional[str]]:
+    """
+    Return (user_id, role) for the current request.
+    
+    The session cookie is read once and cached on flask.g, so stacked
+    decorators (and any later checks) reuse the same values.
+    """
+    auth = g.get('_auth')
+    if auth is None:
+        role = session.get('role')
+        # Interned like the allowed-role sets, so membership is an identity hit
+        if isinstance(role, str):
+            role = sys.intern(role)
+        auth = g._auth = (session.get('user_id'), role)
+    return auth
+
+
+def _auth_gate(
+    allowed: Optional[FrozenSet[str]],
+    unauthorized: bytes = _AUTH_REQUIRED,
+    forbidden: bytes = b'',
+    session_invalid: Optional[bytes] = None
+) -> Callable:
+    """
+    Build the one wrapper shared by every auth decorator below.
+    
+    allowed=None only requires a login; otherwise the session role must be
+    in the frozenset. All rejection bodies are serialized by the caller when
+    the decorator is created, so a request only does the two checks.
+    session_invalid, if given, is returned (401) when the role is missing.
+    """
+    def decorator(f: Callable) -> Callable:
+        @wraps(f)
+        def decorated_function(*args: Any, **kwargs: Any) -> Any:
+            user_id, user_role = _get_auth()
+            
+            # Check authentication first
+            if user_id is None:
+                return _error_response(unauthorized, 401)
+            
+            # Check authorization (role)
+            if allowed is not None and user_role not in allowed:
+                if session_invalid is not None and not user_role:
+                    # Session corrupted - force re-login
+                    return _error_response(session_invalid, 401)
+                return _error_response(forbidden, 403)
+            
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
 
 def login_required(f: Callable) -> Callable:
     """Decorator to check if user is logged in"""
-    @wraps(f)
-    def decorated_function(*args: Any, **kwargs: Any) -> Any:
-        if 'user_id' not in session:
-            return jsonify({
-                'status': 'error',
-                'message': 'Authentication required'
-            }), 401
-        return f(*args, **kwargs)
-    return decorated_function
+    return _auth_gate(None)(f)
 
 
 def role_required(required_role: str) -> Callable:
     """
     Decorator to enforce role-based access control (RBAC)
     
+    Includes the login check, so there is no need to stack it with
+    @login_required - one wrapper per request instead of two.
+    
     HOW IT WORKS:
     1. Checks if 'user_id' exists in session (authentication)
     2. Checks if session['role'] matches required_role (authorization)
@@ -45,28 +111,10 @@ def role_required(required_role: str) -> Callable:
     - Only requests through Flask server include session cookies
     - Therefore, decorator automatically blocks unauthorized access
     """
-    def decorator(f: Callable) -> Callable:
-        @wraps(f)
-        def decorated_function(*args: Any, **kwargs: Any) -> Any:
-            # Check authentication first
-            if 'user_id' not in session:
-                return jsonify({
-                    'status': 'error',
-                    'message': 'Authentication required'
-                }), 401
-            
-            # Check authorization (role)
-            user_role = session.get('role')
-            if user_role != required_role:
-                return jsonify({
-                    'status': 'error',
-                    'message': f'Access denied. {required_role.capitalize()} role required'
-                }), 403
-            
-            # Both checks passed - proceed with request
-            return f(*args, **kwargs)
-        return decorated_function
-    return decorator
+    return _auth_gate(
+        frozenset((sys.intern(required_role),)),
+        forbidden=_error_body(f'Access denied. {required_role.capitalize()} role required')
+    )
 
 
 def require_role(*allowed_roles: str) -> Callable:
@@ -85,57 +133,20 @@ def require_role(*allowed_roles: str) -> Callable:
         def doctor_only_route():
             pass
     """
-    def decorator(f: Callable) -> Callable:
-        @wraps(f)
-        def decorated_function(*args: Any, **kwargs: Any) -> Any:
-            # First check: Authentication (401 if not logged in)
-            if 'user_id' not in session:
-                return jsonify({
-                    'status': 'error',
-                    'message': 'Unauthorized: Authentication required',
-                    'code': 'AUTH_REQUIRED'
-                }), 401
-            
-            # Second check: Authorization (403 if wrong role)
-            user_role = session.get('role')
-            if not user_role:
-                # Session corrupted - force re-login
-                return jsonify({
-                    'status': 'error',
-                    'message': 'Unauthorized: Session invalid',
-                    'code': 'SESSION_INVALID'
-                }), 401
-            
-            if user_role not in allowed_roles:
-                return jsonify({
-                    'status': 'error',
-                    'message': f'Forbidden: Requires role(s): {", ".join(allowed_roles)}',
-                    'code': 'INSUFFICIENT_PERMISSIONS'
-                }), 403
-            
-            return f(*args, **kwargs)
-        return decorated_function
-    return decorator
+    return _auth_gate(
+        frozenset(sys.intern(r) for r in allowed_roles),
+        unauthorized=_AUTH_REQUIRED_CODED,
+        forbidden=_error_body(
+            f'Forbidden: Requires role(s): {", ".join(allowed_roles)}',
+            code='INSUFFICIENT_PERMISSIONS'
+        ),
+        session_invalid=_SESSION_INVALID
+    )
 
 
 def roles_required(*required_roles: str) -> Callable:
     """Decorator to check if user has one of the required roles"""
-    def decorator(f: Callable) -> Callable:
-        @wraps(f)
-        def decorated_function(*args: Any, **kwargs: Any) -> Any:
-            if 'user_id' not in session:
-                return jsonify({
-                    'status': 'error',
-                    'message': 'Authentication required'
-                }), 401
-            
-            user_role = session.get('role')
-            if user_role not in required_roles:
-                return jsonify({
-                    'status': 'error',
-                    'message': f'Access denied. Required roles: {", ".join(required_roles)}'
-                }), 403
-            
-            return f(*args, **kwargs)
-        return decorated_function
-    return decorator
+    return _auth_gate(
+        frozenset(sys.intern(r) for r in required_roles),
+        forbidden=_error_body(f'Access denied. Required roles: {", ".join(required_roles)}')
+    )
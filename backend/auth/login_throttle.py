@@ -0,0 +1,95 @@
+"""
+Failed-login bookkeeping for /auth/login
+
+Password verification is deliberately slow (salted PBKDF2), which makes
+repeated bad logins - typos retried by a script, credential stuffing - the
+most expensive requests the auth blueprint serves. This module lets login
+reject them without re-hashing:
+
+- a negative cache of (phone number, password digest) pairs that already
+  failed, so an identical retry is answered in microseconds
+- a bucket of MAX_FAILURES_PER_WINDOW failures per FAILURE_WINDOW for each
+  (phone number, client address) pair - keyed on the client too, so
+  someone who only knows a phone number cannot lock its owner out
+
+State is per process and only ever shortens the path to a 401/429; any
+ORM write to a User (new registration, password change) clears that
+phone number's entries.
+"""
+import hashlib
+import threading
+import time
+from typing import Dict, List
+from sqlalchemy import event
+from models import User
+
+FAILED_PAIR_TTL = 300  # seconds a known-bad password is remembered
+FAILURE_WINDOW = 60  # seconds
+MAX_FAILURES_PER_WINDOW = 3
+MAX_TRACKED_PHONES = 10000
+MAX_CLIENTS_PER_PHONE = 100
+
+# phone_number -> {password digest: expires_at}
+_bad_passwords: Dict[str, Dict[bytes, float]] = {}
+# phone_number -> {client address: timestamps of recent failures}
+_recent_failures: Dict[str, Dict[str, List[float]]] = {}
+_lock = threading.Lock()
+
+
+def _digest(password: str) -> bytes:
+    """Short fingerprint of a password (never stored in plain text)"""
+    return hashlib.sha256(password.encode('utf-8')).digest()[:16]
+
+
+def is_throttled(phone_number: str, client: str) -> bool:
+    """True if this client used up its failed attempts on this phone number"""
+    now = time.monotonic()
+    with _lock:
+        recent = _recent_failures.get(phone_number, {}).get(client)
+        if not recent:
+            return False
+        recent[:] = [t for t in recent if now - t < FAILURE_WINDOW]
+        return len(recent) >= MAX_FAILURES_PER_WINDOW
+
+
+def is_known_bad(phone_number: str, password: str) -> bool:
+    """True if this exact password already failed for this phone number"""
+    expires_at = _bad_passwords.get(phone_number, {}).get(_digest(password))
+    return expires_at is not None and expires_at > time.monotonic()
+
+
+def record_failure(phone_number: str, password: str, client: str) -> None:
+    """Remember a failed attempt (negative cache + this client's rate bucket)"""
+    now = time.monotonic()
+    with _lock:
+        # Bounded: drop the oldest tracked phone number once full
+        if phone_number not in _bad_passwords and len(_bad_passwords) >= MAX_TRACKED_PHONES:
+            oldest = next(iter(_bad_passwords))
+            _bad_passwords.pop(oldest, None)
+            _recent_failures.pop(oldest, None)
+        _bad_passwords.setdefault(phone_number, {})[_digest(password)] = now + FAILED_PAIR_TTL
+        clients = _recent_failures.setdefault(phone_number, {})
+        # ... and the oldest client of a phone number attacked from many addresses
+        if client not in clients and len(clients) >= MAX_CLIENTS_PER_PHONE:
+            clients.pop(next(iter(clients)), None)
+        clients.setdefault(client, []).append(now)
+
+
+def clear(phone_number: str) -> None:
+    """Forget all failures for a phone number, from every client (user change)"""
+    with _lock:
+        _bad_passwords.pop(phone_number, None)
+        _recent_failures.pop(phone_number, None)
+
+
+def clear_client(phone_number: str, client: str) -> None:
+    """Successful login: reset this client's bucket (other clients keep theirs)"""
+    with _lock:
+        _recent_failures.get(phone_number, {}).pop(client, None)
+
+
+@event.listens_for(User, 'after_insert')
+@event.listens_for(User, 'after_update')
+def _clear_on_user_write(mapper, connection, target):
+    """A new account or changed password must not hit stale negative entries"""
+    clear(target.phone_number)
@@ -1,9 +1,20 @@
+from types import MappingProxyType
 from flask import Blueprint, request, jsonify, session
+from sqlalchemy import or_, select
 from models import db, User, PatientProfile
 from auth.decorators import login_required
+from auth.user_cache import get_user_dict
+from auth import login_throttle
 
 auth_bp = Blueprint('auth', __name__)
 
+# Post-login redirect URL per role (read-only, built once)
+_REDIRECT_URLS = MappingProxyType({
+    'patient': '/patient/dashboard.html',
+    'doctor': '/doctor/dashboard.html',
+    'lab': '/lab/dashboard.html'
+})
+
 
 @auth_bp.route('/register', methods=['POST'])
 def register():
@@ -32,22 +43,29 @@ def register():
             'message': 'Invalid role. Must be patient, doctor, or lab'
         }), 400
     
+    # Check phone number and email (if provided) in one round-trip;
+    # both columns are unique, so each side of the OR is an index lookup
+    match = User.phone_number == phone_number
+    if email:
+        match = or_(match, User.email == email)
+    with db.session.no_autoflush:
+        conflicts = db.session.execute(
+            select(User.phone_number, User.email).where(match)
+        ).all()
+    
     # Check if user already exists
-    existing_user = User.query.filter_by(phone_number=phone_number).first()
-    if existing_user:
+    if any(row.phone_number == phone_number for row in conflicts):
         return jsonify({
             'status': 'error',
             'message': 'Phone number already registered'
         }), 409
     
     # Check if email already exists (if provided)
-    if email:
-        existing_email = User.query.filter_by(email=email).first()
-        if existing_email:
-            return jsonify({
-                'status': 'error',
-                'message': 'Email already registered'
-            }), 409
+    if conflicts:
+        return jsonify({
+            'status': 'error',
+            'message': 'Email already registered'
+        }), 409
     
     try:
         # Create new user
@@ -100,17 +118,36 @@ def login():
     
     phone_number = data['phone_number']
     password = data['password']
+    client = request.remote_addr
+    
+    # Too many recent failures for this number from this client - don't spend a hash on it
+    if login_throttle.is_throttled(phone_number, client):
+        return jsonify({
+            'status': 'error',
+            'message': 'Too many failed login attempts. Please try again in a minute'
+        }), 429
+    
+    # Same password already failed for this number - skip the lookup and hash
+    if login_throttle.is_known_bad(phone_number, password):
+        login_throttle.record_failure(phone_number, password, client)
+        return jsonify({
+            'status': 'error',
+            'message': 'Invalid phone number or password'
+        }), 401
     
     # Find user
     user = User.query.filter_by(phone_number=phone_number).first()
     
     # Verify user exists and password is correct
     if not user or not user.check_password(password):
+        login_throttle.record_failure(phone_number, password, client)
         return jsonify({
             'status': 'error',
             'message': 'Invalid phone number or password'
         }), 401
     
+    login_throttle.clear_client(phone_number, client)
+    
     # Check if user is active
     if not user.is_active:
         return jsonify({
@@ -137,19 +174,12 @@ def login():
     session['role'] = user.role
     session['full_name'] = user.full_name
     
-    # Determine redirect URL based on role
-    redirect_urls = {
-        'patient': '/patient/dashboard.html',
-        'doctor': '/doctor/dashboard.html',
-        'lab': '/lab/dashboard.html'
-    }
-    
     return jsonify({
         'status': 'success',
         'message': 'Login successful',
         'data': {
             'user': user.to_dict(),
-            'redirect_url': redirect_urls.get(user.role, '/')
+            'redirect_url': _REDIRECT_URLS.get(user.role, '/')
         }
     }), 200
 
@@ -172,9 +202,9 @@ def logout():
 def get_current_user():
     """Get current logged-in user information"""
     user_id = session.get('user_id')
-    user = User.query.get(user_id)
+    user_data = get_user_dict(user_id)  # short-TTL cache, no query on repeat calls
     
-    if not user:
+    if user_data is None:
         session.clear()
         return jsonify({
             'status': 'error',
@@ -183,7 +213,7 @@ def get_current_user():
     
     return jsonify({
         'status': 'success',
-        'data': user.to_dict()
+        'data': user_data
     }), 200
 
 
@@ -191,7 +221,7 @@ def get_current_user():
 def check_session():
     """Check if user has active session"""
     if 'user_id' in session:
-        return jsonify({
+        response = jsonify({
             'status': 'success',
             'authenticated': True,
             'data': {
@@ -199,7 +229,15 @@ def check_session():
                 'role': session.get('role'),
                 'full_name': session.get('full_name')
             }
-        }), 200
+        })
+        # Let the browser reuse a positive answer briefly (pages poll this).
+        # Negative answers are not cached so a fresh login is seen at once,
+        # and Vary: Cookie makes a logout or another user's login (new or
+        # cleared session cookie) miss the cached answer.
+        response.cache_control.private = True
+        response.cache_control.max_age = 5
+        response.vary.add('Cookie')
+        return response, 200
     else:
         return jsonify({
             'status': 'success',
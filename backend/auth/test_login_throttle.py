@@ -0,0 +1,83 @@
+"""
+Tests for the failed-login throttle on /auth/login
+
+Run from the backend folder:
+    python -m pytest auth/test_login_throttle.py
+    python auth/test_login_throttle.py   (without pytest)
+"""
+import os
+import sys
+import tempfile
+
+# Throwaway SQLite database - must be set before the app (config) is imported
+_DB_FILE = os.path.join(tempfile.mkdtemp(), 'login_throttle_test.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{_DB_FILE}'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from models import db
+from auth import login_throttle
+
+PHONE = '9000000001'
+PASSWORD = 'correct-password'
+ATTACKER = '203.0.113.7'
+OWNER = '198.51.100.20'
+
+app, _socketio = create_app('development')
+with app.app_context():
+    db.create_all()
+
+_client = app.test_client()
+_client.post('/auth/register', json={
+    'phone_number': PHONE,
+    'password': PASSWORD,
+    'role': 'patient',
+    'full_name': 'Throttle Test'
+})
+
+
+def login(password, remote_addr):
+    """POST /auth/login for PHONE from the given client address"""
+    return app.test_client().post(
+        '/auth/login',
+        json={'phone_number': PHONE, 'password': password},
+        environ_base={'REMOTE_ADDR': remote_addr}
+    )
+
+
+def setup_function():
+    login_throttle.clear(PHONE)
+
+
+def test_bucket_fills_for_the_failing_client():
+    for attempt in range(login_throttle.MAX_FAILURES_PER_WINDOW):
+        assert login(f'wrong-{attempt}', ATTACKER).status_code == 401
+    
+    # Even the correct password is refused from that client during the window
+    assert login(PASSWORD, ATTACKER).status_code == 429
+
+
+def test_other_client_still_logs_in_while_bucket_is_full():
+    for attempt in range(login_throttle.MAX_FAILURES_PER_WINDOW):
+        login(f'wrong-{attempt}', ATTACKER)
+    assert login_throttle.is_throttled(PHONE, ATTACKER)
+    
+    response = login(PASSWORD, OWNER)
+    
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'success'
+
+
+def test_known_bad_password_is_rejected_for_every_client():
+    assert login('wrong-password', ATTACKER).status_code == 401
+    assert login_throttle.is_known_bad(PHONE, 'wrong-password')
+    
+    assert login('wrong-password', OWNER).status_code == 401
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            setup_function()
+            test()
+            print(f"✓ {name}")
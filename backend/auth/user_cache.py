@@ -0,0 +1,63 @@
+"""
+Short-lived cache of serialized users for session lookups
+
+Dashboards call /auth/me on every page load, but a user row almost never
+changes - so its to_dict() is kept for a short TTL instead of querying the
+database each time. Entries are dropped as soon as a User is updated or
+deleted through the ORM in this process; other workers expire on the TTL.
+"""
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from flask import g
+from sqlalchemy import event
+from models import db, User
+
+USER_CACHE_TTL = 60  # seconds
+USER_CACHE_MAXSIZE = 10000
+
+# user_id -> (expires_at, to_dict() result)
+_cache: Dict[int, Tuple[float, Dict]] = {}
+_lock = threading.Lock()
+
+
+def get_user_dict(user_id: int) -> Optional[Dict]:
+    """
+    Return user.to_dict() for user_id, or None if the user does not exist
+
+    Memoized on flask.g for the rest of the request, then in the process-wide
+    TTL cache. The returned dict is shared - treat it as read-only.
+    """
+    memo = g.setdefault('_user_dicts', {})
+    if user_id in memo:
+        return memo[user_id]
+
+    now = time.monotonic()
+    entry = _cache.get(user_id)
+    if entry is not None and entry[0] > now:
+        data = entry[1]
+    else:
+        user = db.session.get(User, user_id)
+        data = user.to_dict() if user else None
+        if data is not None:
+            with _lock:
+                # Bounded: drop the oldest entry once full
+                if len(_cache) >= USER_CACHE_MAXSIZE:
+                    _cache.pop(next(iter(_cache)), None)
+                _cache[user_id] = (now + USER_CACHE_TTL, data)
+
+    memo[user_id] = data
+    return data
+
+
+def invalidate_user(user_id: int) -> None:
+    """Forget the cached copy of a user (call after raw SQL updates)"""
+    with _lock:
+        _cache.pop(user_id, None)
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _drop_cached_user(mapper, connection, target):
+    """Keep the cache consistent with ORM writes (role, is_active, profile)"""
+    invalidate_user(target.id)
@@ -2,9 +2,22 @@
 Knowledge Base for Healthcare Chatbot
 Implements simple RAG (Retrieval-Augmented Generation) using predefined FAQs
 """
+import heapq
 import re
+import sys
+from functools import lru_cache
+from operator import itemgetter
 from typing import List, Dict, Tuple
 
+# Word tokenizer for queries (compiled once, not per search)
+_WORD_RE = re.compile(r'\w+')
+_SPACE_RE = re.compile(r'\s+')
+
+_SCORE = itemgetter("score")
+
+# Distinct (query, top_k) results kept by search_knowledge
+SEARCH_CACHE_SIZE = 1024
+
 # Healthcare FAQs organized by category
 HEALTHCARE_KNOWLEDGE = {
     "appointments": [
@@ -112,41 +125,102 @@ class KnowledgeBase:
     def __init__(self):
         self.knowledge = HEALTHCARE_KNOWLEDGE
         self.emergency_keywords = EMERGENCY_KEYWORDS
+        self._build_index()
         
-    def search_knowledge(self, query: str, top_k: int = 3) -> List[Dict]:
+    def _build_index(self):
         """
-        Search knowledge base using keyword matching
-        Returns top-k most relevant Q&A pairs
+        Precompute lookup structures from the (static) knowledge
+        
+        - _qas: flat list of (category, qa) in knowledge order
+        - _keyword_phrases: (keyword, qa index) pairs for the phrase check
+        - _word_index: keyword word -> indices of QAs using it (inverted index)
+        - version: counter bumped on every build
         """
-        query_lower = query.lower()
-        results = []
+        self._qas: List[Tuple[str, Dict]] = []
+        self._keyword_phrases: List[Tuple[str, int]] = []
+        self._word_index: Dict[str, List[int]] = {}
         
-        # Search across all categories
         for category, qa_list in self.knowledge.items():
             for qa in qa_list:
-                # Calculate relevance score based on keyword matches
-                score = 0
-                for keyword in qa["keywords"]:
-                    if keyword in query_lower:
-                        score += 1
+                idx = len(self._qas)
+                self._qas.append((category, qa))
                 
-                # Add partial word matches
-                query_words = set(re.findall(r'\w+', query_lower))
-                keyword_words = set(' '.join(qa["keywords"]).split())
-                common_words = query_words & keyword_words
-                score += len(common_words) * 0.5
+                # Lowercased and interned once - queries are lowercased too
+                keywords = [sys.intern(k.lower()) for k in qa["keywords"]]
                 
-                if score > 0:
-                    results.append({
-                        "category": category,
-                        "question": qa["question"],
-                        "answer": qa["answer"],
-                        "score": score
-                    })
+                for keyword in keywords:
+                    self._keyword_phrases.append((keyword, idx))
+                
+                for word in {sys.intern(w) for k in keywords for w in k.split()}:
+                    self._word_index.setdefault(word, []).append(idx)
+        
+        # Fresh result cache for the (re)built index
+        self._search_cached = lru_cache(maxsize=SEARCH_CACHE_SIZE)(self._retrieve)
+        
+        # Bumped on every (re)build - lets callers key caches on the content
+        self.version = getattr(self, 'version', 0) + 1
+    
+    def search_knowledge(self, query: str, top_k: int = 3) -> List[Dict]:
+        """
+        Search knowledge base using keyword matching
+        Returns top-k most relevant Q&A pairs
+        
+        Chatbot questions repeat a lot, so results are cached on the
+        normalized query (lowercased, whitespace collapsed). The returned
+        dicts are shared between calls - treat them as read-only.
+        """
+        query_lower = _SPACE_RE.sub(' ', query.strip().lower())
+        return list(self._search_cached(query_lower, top_k)[0])
+    
+    def retrieve(self, query: str, top_k: int = 3) -> Tuple[List[Dict], str]:
+        """
+        search_knowledge + get_context_string in one cached lookup
+        
+        Returns (relevant items, context string); a repeated question skips
+        both the ranking and the formatting.
+        """
+        query_lower = _SPACE_RE.sub(' ', query.strip().lower())
+        items, context = self._search_cached(query_lower, top_k)
+        return list(items), context
+    
+    def _retrieve(self, query_lower: str, top_k: int) -> Tuple[Tuple[Dict, ...], str]:
+        """Ranked items and their formatted context for a normalized query"""
+        items = self._rank(query_lower, top_k)
+        return items, self.get_context_string(items)
+    
+    def _rank(self, query_lower: str, top_k: int) -> Tuple[Dict, ...]:
+        """
+        Score every QA against a normalized query (uncached)
+        
+        Scoring: +1 for each keyword phrase found in the query, +0.5 for
+        each query word that is also a keyword word. The query is tokenized
+        once and word matches are looked up in the inverted index.
+        """
+        scores: Dict[int, float] = {}
+        
+        # Calculate relevance score based on keyword matches
+        for keyword, idx in self._keyword_phrases:
+            if keyword in query_lower:
+                scores[idx] = scores.get(idx, 0.0) + 1
+        
+        # Add partial word matches
+        for word in set(_WORD_RE.findall(query_lower)):
+            for idx in self._word_index.get(word, ()):
+                scores[idx] = scores.get(idx, 0.0) + 0.5
+        
+        # Knowledge order, so equal scores keep their original ranking
+        results = []
+        for idx in sorted(scores):
+            category, qa = self._qas[idx]
+            results.append({
+                "category": category,
+                "question": qa["question"],
+                "answer": qa["answer"],
+                "score": scores[idx]
+            })
         
-        # Sort by relevance score and return top-k
-        results.sort(key=lambda x: x["score"], reverse=True)
-        return results[:top_k]
+        # Top-k by relevance score (stable, same order as a full sort)
+        return tuple(heapq.nlargest(top_k, results, key=_SCORE))
     
     def get_context_string(self, relevant_items: List[Dict]) -> str:
         """
@@ -4,14 +4,20 @@ Dual-chatbot system with role-based separation:
 1. Patient Chatbot (public, educational only)
 2. Doctor Chatbot (restricted, clinical support)
 """
-from flask import request, jsonify, session
-import google.generativeai as genai
+from flask import request, jsonify, session, Response, stream_with_context, current_app, abort
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Optional
 from datetime import datetime
 
 from . import chatbot_bp
 from .knowledge_base import knowledge_base
 from .safety_checks import safety_checker
+from .semantic_cache import semantic_cache, CacheKey
 from auth.decorators import role_required
 
 
@@ -20,32 +26,207 @@ from auth.decorators import role_required
 # ============================================================
 # Load prompts from separate files for maintainability
 
+# Prompt files are re-read only when their mtime changes (one stat() per
+# call), so edits to prompts/*.txt apply without restarting the server
+_PROMPT_CACHE = {}  # filename -> (mtime, content)
+_PROMPT_ERRORS = set()  # filenames whose load error was already reported
+
+
 def load_prompt(filename):
     """Load system prompt from file"""
     try:
         prompt_path = os.path.join(os.path.dirname(__file__), 'prompts', filename)
+        mtime = os.stat(prompt_path).st_mtime
+        cached = _PROMPT_CACHE.get(filename)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        
         with open(prompt_path, 'r', encoding='utf-8') as f:
-            return f.read().strip()
+            content = f.read().strip()
+        _PROMPT_CACHE[filename] = (mtime, content)
+        _PROMPT_ERRORS.discard(filename)
+        return content
     except Exception as e:
-        print(f"Error loading prompt {filename}: {e}")
+        if filename not in _PROMPT_ERRORS:
+            _PROMPT_ERRORS.add(filename)
+            print(f"Error loading prompt {filename}: {e}")
         return ""
 
-# Patient chatbot prompt (public, educational)
-PATIENT_PROMPT = load_prompt('patient_prompt.txt')
-
-# Doctor chatbot prompt (restricted, clinical support)
-DOCTOR_PROMPT = load_prompt('doctor_prompt.txt')
-
 # Fallback if prompts fail to load
-if not PATIENT_PROMPT:
-    PATIENT_PROMPT = """You are a health education assistant. Provide general health information only.
+_PATIENT_FALLBACK = """You are a health education assistant. Provide general health information only.
 Never diagnose, prescribe, or access patient records. Keep responses short and simple."""
 
-if not DOCTOR_PROMPT:
-    DOCTOR_PROMPT = """You are a clinical support assistant for doctors.
+_DOCTOR_FALLBACK = """You are a clinical support assistant for doctors.
 Summarize provided data only. Never make final diagnoses or prescriptions."""
 
 
+def get_patient_prompt():
+    """Patient chatbot prompt (public, educational) - current file contents"""
+    return load_prompt('patient_prompt.txt') or _PATIENT_FALLBACK
+
+
+def get_doctor_prompt():
+    """Doctor chatbot prompt (restricted, clinical support) - current file contents"""
+    return load_prompt('doctor_prompt.txt') or _DOCTOR_FALLBACK
+
+
+# Prompts as loaded at startup (kept for existing imports)
+PATIENT_PROMPT = get_patient_prompt()
+DOCTOR_PROMPT = get_doctor_prompt()
+
+
+# Request validation errors (read-only, built once)
+_ERR_MISSING_MESSAGE = MappingProxyType({
+    "success": False,
+    "response": "Please provide a message.",
+    "metadata": MappingProxyType({"response_type": "error"})
+})
+_ERR_EMPTY_MESSAGE = MappingProxyType({
+    "success": False,
+    "response": "Message cannot be empty.",
+    "metadata": MappingProxyType({"response_type": "error"})
+})
+_ERR_MISSING_MESSAGE_DOCTOR = MappingProxyType({
+    "success": False,
+    "response": "Please provide a message.",
+    "metadata": MappingProxyType({"bot_type": "doctor", "response_type": "error"})
+})
+_ERR_EMPTY_MESSAGE_DOCTOR = MappingProxyType({
+    "success": False,
+    "response": "Message cannot be empty.",
+    "metadata": MappingProxyType({"bot_type": "doctor", "response_type": "error"})
+})
+
+
+# Response timestamps only need ~100 ms resolution - reuse the formatted
+# string within a tick (single slot, swapped as one tuple, no lock needed)
+_NOW_ISO = (0, "")
+
+
+def now_iso() -> str:
+    """UTC ISO-8601 timestamp, cached for 100 ms"""
+    global _NOW_ISO
+    tick = int(time.time() * 10)
+    cached = _NOW_ISO
+    if cached[0] != tick:
+        cached = (tick, datetime.utcnow().isoformat())
+        _NOW_ISO = cached
+    return cached[1]
+
+
+# google.generativeai pulls in grpc/protobuf - import it on the first AI
+# call instead of at startup (rule-based replies never need it)
+_genai = None
+# Gemini errors worth a retry; the SDK's own types are added on first import
+_RETRYABLE_ERRORS = (TimeoutError,)
+
+
+def _get_genai():
+    """Return the google.generativeai module, importing it on first use"""
+    global _genai, _RETRYABLE_ERRORS
+    if _genai is None:
+        import google.generativeai as genai
+        from google.api_core.exceptions import DeadlineExceeded, ServiceUnavailable
+        from requests.exceptions import Timeout
+        _RETRYABLE_ERRORS = (DeadlineExceeded, ServiceUnavailable, Timeout, TimeoutError)
+        _genai = genai
+    return _genai
+
+
+@lru_cache(maxsize=1)
+def _get_model(api_key: str):
+    """
+    Configured gemini-1.5-flash model, built once per API key
+    
+    genai.configure() mutates global SDK state and GenerativeModel sets up
+    client resources - neither needs repeating per request. The REST
+    transport goes through (eventlet-patched) Python sockets; the default
+    gRPC transport blocks in C and would stall the whole worker per call.
+    """
+    genai = _get_genai()
+    genai.configure(api_key=api_key, transport='rest')
+    return genai.GenerativeModel('gemini-1.5-flash')
+
+
+# Per-attempt Gemini timeout (seconds) - just above typical latency so a
+# stalled call is retried instead of waited out
+GEMINI_TIMEOUT_S = float(os.getenv('GEMINI_TIMEOUT_S', '8'))
+# A streamed answer is generated while it is sent, so its deadline covers
+# the whole reply, not just the first chunk
+GEMINI_STREAM_TIMEOUT_S = float(os.getenv('GEMINI_STREAM_TIMEOUT_S', '60'))
+GEMINI_RETRIES = 1
+GEMINI_RETRY_BACKOFF_S = 0.5
+
+
+def generate_with_retry(model, prompt: str):
+    """
+    model.generate_content with a per-attempt timeout, retrying timeouts
+    
+    Retries GEMINI_RETRIES times with exponential backoff; the last timeout
+    (or any other error) propagates to the caller's error handling.
+    """
+    for attempt in range(GEMINI_RETRIES + 1):
+        try:
+            return model.generate_content(prompt, request_options={"timeout": GEMINI_TIMEOUT_S})
+        except _RETRYABLE_ERRORS:
+            if attempt == GEMINI_RETRIES:
+                raise
+            time.sleep(GEMINI_RETRY_BACKOFF_S * (2 ** attempt))
+
+
+@lru_cache(maxsize=8)
+def _static_prefix(system_prompt: str, kb_version: int) -> str:
+    """
+    Prompt head shared by every request with this system prompt
+    
+    System prompt + platform features, built once per (prompt, knowledge
+    base version). Keeping it first and byte-identical lets Gemini's prefix
+    caching reuse it across requests. A few entries cover both chatbots
+    and a prompt file edit.
+    """
+    return "".join([
+        system_prompt,
+        "\n\n---\n**PLATFORM FEATURES:**\n",
+        knowledge_base.get_all_platform_features(),
+        "\n---\n"
+    ])
+
+
+def build_prompt(user_message: str, system_prompt: str, context: str = "", patient_data: dict = None) -> str:
+    """
+    Assemble the full Gemini prompt
+    
+    Static prefix (system prompt, platform features) first, then the
+    per-request context and the user question.
+    """
+    # ============================================================
+    # CONTEXT INJECTION - Inject retrieved knowledge and patient data
+    # ============================================================
+    
+    # Build context string
+    context_parts = []
+    
+    if context:
+        context_parts.append(f"**KNOWLEDGE BASE:**\n{context}")
+    
+    if patient_data:
+        # Format patient data for doctor chatbot
+        context_parts.append("".join([
+            "**PATIENT DATA:**\n",
+            *(f"- {key}: {value}\n" for key, value in patient_data.items())
+        ]))
+    
+    full_context = "\n\n".join(context_parts) if context_parts else "No additional context available."
+    
+    return "".join([
+        _static_prefix(system_prompt, knowledge_base.version),
+        full_context,
+        "\n\n---\n**USER QUESTION:**\n",
+        user_message,
+        "\n\n**YOUR RESPONSE:**"
+    ])
+
+
 def get_gemini_response(user_message: str, system_prompt: str, context: str = "", patient_data: dict = None) -> dict:
     """
     Call Gemini API with role-specific system prompt
@@ -73,55 +254,29 @@ def get_gemini_response(user_message: str, system_prompt: str, context: str = ""
                 }
             }
         
-        genai.configure(api_key=api_key)
+        full_prompt = build_prompt(user_message, system_prompt, context, patient_data)
         
-        # Use Gemini 1.5 Flash for fast responses
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        
-        # ============================================================
-        # CONTEXT INJECTION - Inject retrieved knowledge and patient data
-        # ============================================================
-        
-        # Build context string
-        context_parts = []
-        
-        if context:
-            context_parts.append(f"**KNOWLEDGE BASE:**\n{context}")
+        def generate():
+            # Use Gemini 1.5 Flash for fast responses
+            return generate_with_retry(_get_model(api_key), full_prompt).text
         
+        # Generate response - the same question (ignoring case/spacing) with
+        # the same role prompt and context is answered from the cache.
+        # Never cache replies built from patient data (PII).
         if patient_data:
-            # Format patient data for doctor chatbot
-            patient_context = "**PATIENT DATA:**\n"
-            for key, value in patient_data.items():
-                patient_context += f"- {key}: {value}\n"
-            context_parts.append(patient_context)
-        
-        full_context = "\n\n".join(context_parts) if context_parts else "No additional context available."
-        
-        full_prompt = f"""{system_prompt}
-
----
-{full_context}
-
-**PLATFORM FEATURES:**
-{knowledge_base.get_all_platform_features()}
-
----
-**USER QUESTION:**
-{user_message}
-
-**YOUR RESPONSE:**"""
-
-        # Generate response
-        response = model.generate_content(full_prompt)
+            response_text = generate()
+        else:
+            cache_key = CacheKey.build(system_prompt, context, user_message)
+            response_text = semantic_cache.get_or_compute(cache_key, generate)
         
         return {
             "success": True,
-            "response": response.text,
+            "response": response_text,
             "metadata": {
                 "response_type": "ai_generated",
                 "model": "gemini-1.5-flash",
                 "context_used": bool(context),
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": now_iso()
             }
         }
     
@@ -136,13 +291,82 @@ def get_gemini_response(user_message: str, system_prompt: str, context: str = ""
         }
 
 
-@chatbot_bp.route('/chat', methods=['POST'])
-def chat():
+def patient_rule_reply(user_message: str) -> Optional[dict]:
+    """
+    Rule-based safety checks for the patient bot (run BEFORE any AI call)
+    
+    Returns the full reply payload for greetings, emergencies and
+    diagnosis/prescription requests, or None if the message may go to AI.
+    """
+    verdict = safety_checker.classify(user_message)
+    if verdict is None:
+        return None
+    
+    return {
+        "success": True,
+        "response": verdict["response"],
+        "metadata": verdict["metadata"]
+    }
+
+
+def patient_reply(user_message: str) -> dict:
     """
-    LEGACY endpoint - redirects to patient chatbot for backward compatibility
-    Kept for existing integrations
+    Full patient chatbot pipeline for one (non-empty) message
+    
+    Rule-based checks, then RAG + Gemini with the patient prompt.
+    Returns the reply payload; unexpected errors propagate to the caller.
     """
-    return chat_patient()
+    # ============================================================
+    # STEP 1: Rule-based safety checks (BEFORE AI)
+    # ============================================================
+    
+    rule_reply = patient_rule_reply(user_message)
+    if rule_reply is not None:
+        return rule_reply
+    
+    # ============================================================
+    # STEP 2: RAG - Retrieve relevant context
+    # ============================================================
+    relevant_knowledge, context_string = knowledge_base.retrieve(user_message, top_k=3)
+    
+    # ============================================================
+    # STEP 3: Generate AI response with PATIENT PROMPT
+    # DATA PRIVACY: Patient chatbot does NOT receive patient data
+    # ============================================================
+    ai_result = get_gemini_response(
+        user_message=user_message,
+        system_prompt=get_patient_prompt(),  # Educational prompt only
+        context=context_string,
+        patient_data=None  # NEVER pass patient data to patient bot
+    )
+    
+    if not ai_result["success"]:
+        # Fallback response if AI fails
+        return {
+            "success": True,
+            "response": "I'm currently having technical difficulties. For immediate assistance, please call our support line at 1800-XXX-XXXX or book an appointment through your dashboard.",
+            "metadata": {
+                "bot_type": "patient",
+                "response_type": "fallback",
+                "ai_error": ai_result["metadata"].get("error")
+            }
+        }
+    
+    # ============================================================
+    # STEP 4: Return response with metadata
+    # ============================================================
+    return {
+        "success": True,
+        "response": ai_result["response"],
+        "metadata": {
+            **ai_result["metadata"],
+            "bot_type": "patient",
+            "safety_check": "passed",
+            "context_retrieved": len(relevant_knowledge) > 0,
+            "knowledge_items_found": len(relevant_knowledge),
+            "data_access": "none"  # Patient bot has NO data access
+        }
+    }
 
 
 @chatbot_bp.route('/chat/patient', methods=['POST'])
@@ -185,116 +409,253 @@ def chat_patient():
         data = request.get_json()
         
         if not data or 'message' not in data:
-            return jsonify({
-                "success": False,
-                "response": "Please provide a message.",
-                "metadata": {"response_type": "error"}
-            }), 400
+            return jsonify(_ERR_MISSING_MESSAGE), 400
         
         user_message = data.get('message', '').strip()
         
         if not user_message:
-            return jsonify({
-                "success": False,
-                "response": "Message cannot be empty.",
-                "metadata": {"response_type": "error"}
-            }), 400
+            return jsonify(_ERR_EMPTY_MESSAGE), 400
         
-        # ============================================================
-        # STEP 1: Rule-based safety checks (BEFORE AI)
-        # ============================================================
-        
-        # Check for greetings
-        if safety_checker.is_greeting(user_message):
-            return jsonify({
-                "success": True,
-                "response": safety_checker.get_greeting_response(),
-                "metadata": {
-                    "response_type": "rule_based",
-                    "rule_triggered": "greeting"
-                }
-            })
+        return jsonify(patient_reply(user_message))
+    
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "response": "An unexpected error occurred. Please contact support.",
+            "metadata": {
+                "bot_type": "patient",
+                "response_type": "error",
+                "error": str(e)
+            }
+        }), 500
+
+
+# LEGACY endpoint - same view as the patient chatbot, for backward compatibility
+# (kept for existing integrations; registered directly, no wrapper view)
+chatbot_bp.add_url_rule('/chat', endpoint='chat', view_func=chat_patient, methods=['POST'])
+
+
+MAX_BATCH_MESSAGES = 20
+BATCH_WORKERS = 8
+# Per-client budget for /chat/batch, counted per message (not per request)
+BATCH_RATE_LIMIT = 60
+BATCH_RATE_WINDOW = 60  # seconds
+MAX_TRACKED_BATCH_CLIENTS = 1000
+
+# client address -> timestamps of recently answered batch messages
+_batch_usage = {}
+_batch_lock = threading.Lock()
+
+
+def _take_batch_quota(client: str, count: int) -> bool:
+    """Charge count messages to the client's window; False if over BATCH_RATE_LIMIT"""
+    now = time.monotonic()
+    with _batch_lock:
+        recent = [t for t in _batch_usage.get(client, ()) if now - t < BATCH_RATE_WINDOW]
+        if len(recent) + count > BATCH_RATE_LIMIT:
+            _batch_usage[client] = recent
+            return False
+        # Bounded: drop the oldest tracked client once full
+        if client not in _batch_usage and len(_batch_usage) >= MAX_TRACKED_BATCH_CLIENTS:
+            _batch_usage.pop(next(iter(_batch_usage)), None)
+        _batch_usage[client] = recent + [now] * count
+        return True
+
+
+def _batch_item_reply(item) -> dict:
+    """Patient reply for one /chat/batch item ({"id", "text"} or a plain string)"""
+    if isinstance(item, dict):
+        item_id, text = item.get("id"), item.get("text")
+    else:
+        item_id, text = None, item
+    
+    user_message = text.strip() if isinstance(text, str) else ""
+    if not user_message:
+        return {"id": item_id, **_ERR_EMPTY_MESSAGE}
+    
+    try:
+        return {"id": item_id, **patient_reply(user_message)}
+    except Exception as e:
+        return {
+            "id": item_id,
+            "success": False,
+            "response": "An unexpected error occurred. Please contact support.",
+            "metadata": {
+                "bot_type": "patient",
+                "response_type": "error",
+                "error": str(e)
+            }
+        }
+
+
+@chatbot_bp.route('/chat/batch', methods=['POST'])
+def chat_batch():
+    """
+    PATIENT CHATBOT - several messages in one request (same rules as /chat/patient)
+    
+    Request body:
+        {
+            "messages": [{"id": "t1", "text": "user's message"}, ...]
+        }
+    
+    Response:
+        {
+            "success": true,
+            "results": [{"id": "t1", "success": ..., "response": ..., "metadata": {...}}, ...]
+        }
+    
+    Results keep the request order. Messages needing AI are answered
+    concurrently; at most MAX_BATCH_MESSAGES per request and
+    BATCH_RATE_LIMIT messages per client per BATCH_RATE_WINDOW.
+    
+    Testing only (chatbot/test_chatbot.py): answers 404 unless
+    CHATBOT_BATCH_ENABLED is set.
+    """
+    if not current_app.config.get('CHATBOT_BATCH_ENABLED'):
+        abort(404)
+    
+    data = request.get_json(silent=True)
+    messages = data.get('messages') if isinstance(data, dict) else None
+    
+    if not isinstance(messages, list) or not messages:
+        return jsonify({
+            "success": False,
+            "response": "Please provide a non-empty list of messages.",
+            "metadata": {"response_type": "error"}
+        }), 400
+    
+    if len(messages) > MAX_BATCH_MESSAGES:
+        return jsonify({
+            "success": False,
+            "response": f"At most {MAX_BATCH_MESSAGES} messages per batch.",
+            "metadata": {"response_type": "error"}
+        }), 400
+    
+    if not _take_batch_quota(request.remote_addr, len(messages)):
+        return jsonify({
+            "success": False,
+            "response": f"Too many messages. At most {BATCH_RATE_LIMIT} per {BATCH_RATE_WINDOW} seconds.",
+            "metadata": {"response_type": "error"}
+        }), 429
+    
+    with ThreadPoolExecutor(max_workers=min(BATCH_WORKERS, len(messages))) as executor:
+        results = list(executor.map(_batch_item_reply, messages))
+    
+    return jsonify({"success": True, "results": results})
+
+
+def _sse(event: str, payload: dict) -> str:
+    """Format one Server-Sent Event (serialized by the app's orjson provider)"""
+    return f"event: {event}\ndata: {current_app.json.dumps(payload)}\n\n"
+
+
+@chatbot_bp.route('/chat/patient/stream', methods=['POST'])
+def chat_patient_stream():
+    """
+    PATIENT CHATBOT - streaming variant (Server-Sent Events)
+    
+    Same safety rules, knowledge retrieval and prompt as /chat/patient, but
+    the AI answer is pushed while Gemini generates it, so the first words
+    show up long before the full reply is ready. Read it with fetch() and a
+    stream reader (EventSource cannot send a POST body).
+    
+    Events:
+        event: delta    data: {"delta": "next piece of the answer"}
+        event: done     data: same payload as /chat/patient (full response)
+    
+    Rule-based replies, fallbacks and cached answers arrive as one "done"
+    event (cached answers are preceded by a single delta). If Gemini fails
+    after some deltas were sent, "done" carries the partial text with
+    metadata.truncated = true instead of the fallback message.
+    """
+    data = request.get_json(silent=True)
+    
+    if not data or 'message' not in data:
+        return jsonify(_ERR_MISSING_MESSAGE), 400
+    
+    user_message = (data.get('message') or '').strip()
+    
+    if not user_message:
+        return jsonify(_ERR_EMPTY_MESSAGE), 400
+    
+    rule_reply = patient_rule_reply(user_message)
+    
+    def events():
+        if rule_reply is not None:
+            yield _sse('done', rule_reply)
+            return
         
-        # Check for medical emergencies
-        emergency_check = safety_checker.check_emergency(user_message)
-        if emergency_check["is_emergency"]:
-            return jsonify({
-                "success": True,
-                "response": emergency_check["response"],
-                "metadata": {
-                    **emergency_check["metadata"],
-                    "safety_check": "emergency",
-                    "severity": emergency_check["severity"]
-                }
-            })
+        relevant_knowledge, context_string = knowledge_base.retrieve(user_message, top_k=3)
+        system_prompt = get_patient_prompt()
+        full_prompt = build_prompt(user_message, system_prompt, context_string)
+        key = CacheKey.build(system_prompt, context_string, user_message)
         
-        # Check for inappropriate requests (diagnosis/prescription)
-        inappropriate_check = safety_checker.check_inappropriate_request(user_message)
-        if inappropriate_check:
-            return jsonify({
+        def done(text: str, truncated: bool = False) -> str:
+            return _sse('done', {
                 "success": True,
-                "response": inappropriate_check["response"],
+                "response": text,
                 "metadata": {
-                    **inappropriate_check["metadata"],
-                    "safety_check": "inappropriate"
+                    "response_type": "ai_generated",
+                    "model": "gemini-1.5-flash",
+                    "context_used": bool(context_string),
+                    "timestamp": now_iso(),
+                    "bot_type": "patient",
+                    "safety_check": "passed",
+                    "context_retrieved": len(relevant_knowledge) > 0,
+                    "knowledge_items_found": len(relevant_knowledge),
+                    "data_access": "none",
+                    "streamed": True,
+                    "truncated": truncated
                 }
             })
         
-        # ============================================================
-        # STEP 2: RAG - Retrieve relevant context
-        # ============================================================
-        relevant_knowledge = knowledge_base.search_knowledge(user_message, top_k=3)
-        context_string = knowledge_base.get_context_string(relevant_knowledge)
+        cached = semantic_cache.get(key)
+        if cached is not None:
+            yield _sse('delta', {"delta": cached})
+            yield done(cached)
+            return
         
-        # ============================================================
-        # STEP 3: Generate AI response with PATIENT PROMPT
-        # DATA PRIVACY: Patient chatbot does NOT receive patient data
-        # ============================================================
-        ai_result = get_gemini_response(
-            user_message=user_message,
-            system_prompt=PATIENT_PROMPT,  # Educational prompt only
-            context=context_string,
-            patient_data=None  # NEVER pass patient data to patient bot
-        )
+        parts = []
+        try:
+            api_key = os.getenv('GEMINI_API_KEY')
+            if not api_key:
+                raise RuntimeError("API key not configured")
+            
+            model = _get_model(api_key)
+            
+            # Deadline for the whole stream; no retry once text has been sent
+            stream = model.generate_content(
+                full_prompt, stream=True, request_options={"timeout": GEMINI_STREAM_TIMEOUT_S}
+            )
+            for chunk in stream:
+                if chunk.text:
+                    parts.append(chunk.text)
+                    yield _sse('delta', {"delta": chunk.text})
+            
+            full_text = ''.join(parts)
+            semantic_cache.set(key, full_text)
+            yield done(full_text)
         
-        if not ai_result["success"]:
-            # Fallback response if AI fails
-            return jsonify({
+        except Exception as e:
+            if parts:
+                # The client already shows these deltas - finish with them (not cached)
+                yield done(''.join(parts), truncated=True)
+                return
+            yield _sse('done', {
                 "success": True,
                 "response": "I'm currently having technical difficulties. For immediate assistance, please call our support line at 1800-XXX-XXXX or book an appointment through your dashboard.",
                 "metadata": {
                     "bot_type": "patient",
                     "response_type": "fallback",
-                    "ai_error": ai_result["metadata"].get("error")
+                    "ai_error": str(e)
                 }
             })
-        
-        # ============================================================
-        # STEP 4: Return response with metadata
-        # ============================================================
-        return jsonify({
-            "success": True,
-            "response": ai_result["response"],
-            "metadata": {
-                **ai_result["metadata"],
-                "bot_type": "patient",
-                "safety_check": "passed",
-                "context_retrieved": len(relevant_knowledge) > 0,
-                "knowledge_items_found": len(relevant_knowledge),
-                "data_access": "none"  # Patient bot has NO data access
-            }
-        })
     
-    except Exception as e:
-        return jsonify({
-            "success": False,
-            "response": "An unexpected error occurred. Please contact support.",
-            "metadata": {
-                "bot_type": "patient",
-                "response_type": "error",
-                "error": str(e)
-            }
-        }), 500
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 
 @chatbot_bp.route('/chat/doctor', methods=['POST'])
@@ -345,21 +706,13 @@ def chat_doctor():
         data = request.get_json()
         
         if not data or 'message' not in data:
-            return jsonify({
-                "success": False,
-                "response": "Please provide a message.",
-                "metadata": {"bot_type": "doctor", "response_type": "error"}
-            }), 400
+            return jsonify(_ERR_MISSING_MESSAGE_DOCTOR), 400
         
         user_message = data.get('message', '').strip()
         patient_data = data.get('patient_data', {})  # Optional patient context
         
         if not user_message:
-            return jsonify({
-                "success": False,
-                "response": "Message cannot be empty.",
-                "metadata": {"bot_type": "doctor", "response_type": "error"}
-            }), 400
+            return jsonify(_ERR_EMPTY_MESSAGE_DOCTOR), 400
         
         # ============================================================
         # DOCTOR VERIFICATION (already done by @role_required decorator)
@@ -370,8 +723,7 @@ def chat_doctor():
         # ============================================================
         # STEP 1: RAG - Retrieve medical knowledge if needed
         # ============================================================
-        relevant_knowledge = knowledge_base.search_knowledge(user_message, top_k=2)
-        context_string = knowledge_base.get_context_string(relevant_knowledge)
+        relevant_knowledge, context_string = knowledge_base.retrieve(user_message, top_k=2)
         
         # ============================================================
         # STEP 2: Generate AI response with DOCTOR PROMPT
@@ -379,7 +731,7 @@ def chat_doctor():
         # ============================================================
         ai_result = get_gemini_response(
             user_message=user_message,
-            system_prompt=DOCTOR_PROMPT,  # Clinical support prompt
+            system_prompt=get_doctor_prompt(),  # Clinical support prompt
             context=context_string,
             patient_data=patient_data if patient_data else None
         )
@@ -429,20 +781,33 @@ def health():
         "status": "healthy",
         "service": "dual_chatbot_system",
         "bots": ["patient", "doctor"],
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": now_iso()
     })
 
 
-@chatbot_bp.route('/knowledge-base-stats', methods=['GET'])
-def knowledge_stats():
-    """Get statistics about knowledge base (for monitoring/debugging)"""
+KB_STATS_MAX_AGE = 300  # seconds
+
+
+@lru_cache(maxsize=1)
+def _knowledge_stats(kb_version: int) -> dict:
+    """Knowledge base statistics, computed once per knowledge base version"""
     total_items = sum(len(qa_list) for qa_list in knowledge_base.knowledge.values())
     
-    return jsonify({
+    return {
         "total_items": total_items,
         "categories": list(knowledge_base.knowledge.keys()),
         "items_per_category": {
             category: len(qa_list) 
             for category, qa_list in knowledge_base.knowledge.items()
         }
-    })
+    }
+
+
+@chatbot_bp.route('/knowledge-base-stats', methods=['GET'])
+def knowledge_stats():
+    """Get statistics about knowledge base (for monitoring/debugging)"""
+    response = jsonify(_knowledge_stats(knowledge_base.version))
+    # Only changes on deploy - let clients and proxies reuse it for a while
+    response.cache_control.public = True
+    response.cache_control.max_age = KB_STATS_MAX_AGE
+    return response
@@ -6,123 +6,136 @@ import re
 from typing import Dict, Optional
 
 
+# Emergency keywords requiring immediate action
+EMERGENCY_KEYWORDS = (
+    "chest pain", "heart attack", "can't breathe", "difficulty breathing",
+    "severe bleeding", "bleeding heavily", "unconscious", "unresponsive",
+    "stroke", "seizure", "convulsion", "suicide", "kill myself",
+    "overdose", "poisoning", "choking", "severe burn",
+    "broken bone", "severe injury", "car accident"
+)
+
+# Urgent keywords requiring quick medical attention
+URGENT_KEYWORDS = (
+    "severe pain", "high fever", "vomiting blood", "blood in urine",
+    "severe headache", "vision loss", "paralysis", "can't move",
+    "severe allergic", "anaphylaxis", "swelling throat"
+)
+
+# Medical advice requests that should be escalated
+DIAGNOSIS_KEYWORDS = (
+    "do i have", "is this", "diagnose", "what disease",
+    "what's wrong with me", "why do i have", "what condition"
+)
+
+PRESCRIPTION_KEYWORDS = (
+    "what medicine", "what medication", "prescribe", "what drug",
+    "should i take", "how much dosage", "medicine for"
+)
+
+
+def _alternation(keywords) -> str:
+    """Regex alternation matching any of the keywords literally"""
+    return '|'.join(re.escape(keyword) for keyword in keywords)
+
+
+def _compile_keyword_scanner(buckets) -> re.Pattern:
+    """
+    Compile every keyword bucket into ONE pattern for a single-pass scan
+    
+    The pattern only stops where some keyword starts. There, one optional
+    named lookahead per bucket captures the first keyword of that bucket
+    (in list order) starting at the position, so a scan reports the same
+    hits as checking each keyword with `in`, for all buckets at once.
+    Case-insensitive, so messages are scanned without a lowercased copy.
+    """
+    any_keyword = _alternation(k for _, keywords in buckets for k in keywords)
+    per_bucket = ''.join(
+        f'(?=(?P<{name}>{_alternation(keywords)}))?' for name, keywords in buckets
+    )
+    return re.compile(f'(?=(?:{any_keyword})){per_bucket}', re.IGNORECASE)
+
+
 class SafetyChecker:
     """
     Rule-based safety checks before AI processing
     Detects medical emergencies and inappropriate queries
     """
     
-    # Emergency keywords requiring immediate action
-    EMERGENCY_KEYWORDS = [
-        "chest pain", "heart attack", "can't breathe", "difficulty breathing",
-        "severe bleeding", "bleeding heavily", "unconscious", "unresponsive",
-        "stroke", "seizure", "convulsion", "suicide", "kill myself",
-        "overdose", "poisoning", "choking", "severe burn",
-        "broken bone", "severe injury", "car accident"
-    ]
-    
-    # Urgent keywords requiring quick medical attention
-    URGENT_KEYWORDS = [
-        "severe pain", "high fever", "vomiting blood", "blood in urine",
-        "severe headache", "vision loss", "paralysis", "can't move",
-        "severe allergic", "anaphylaxis", "swelling throat"
-    ]
+    __slots__ = ()
     
-    # Medical advice requests that should be escalated
-    DIAGNOSIS_KEYWORDS = [
-        "do i have", "is this", "diagnose", "what disease",
-        "what's wrong with me", "why do i have", "what condition"
-    ]
+    # Buckets in priority order, compiled into a single scanner
+    _BUCKETS = (
+        ("emergency", EMERGENCY_KEYWORDS),
+        ("urgent", URGENT_KEYWORDS),
+        ("diagnosis", DIAGNOSIS_KEYWORDS),
+        ("prescription", PRESCRIPTION_KEYWORDS)
+    )
+    _SCANNER = _compile_keyword_scanner(_BUCKETS)
+    _RANK = {
+        (name, keyword): rank
+        for name, keywords in _BUCKETS for rank, keyword in enumerate(keywords)
+    }
     
-    PRESCRIPTION_KEYWORDS = [
-        "what medicine", "what medication", "prescribe", "what drug",
-        "should i take", "how much dosage", "medicine for"
-    ]
+    # Simple greetings: a message that opens with one of these words
+    _GREETING_RE = re.compile(
+        r'^\s*(hi|hello|hey|good\s+(?:morning|afternoon|evening))\b',
+        re.IGNORECASE
+    )
     
-    def __init__(self):
-        self.emergency_keywords = self.EMERGENCY_KEYWORDS
-        self.urgent_keywords = self.URGENT_KEYWORDS
-        self.diagnosis_keywords = self.DIAGNOSIS_KEYWORDS
-        self.prescription_keywords = self.PRESCRIPTION_KEYWORDS
-    
-    def check_emergency(self, message: str) -> Dict:
+    def _scan(self, message: str) -> Dict[str, str]:
         """
-        Check if message contains emergency keywords
-        Returns emergency response if detected
+        One pass over the message for all keyword buckets
+        Returns {bucket: earliest-listed keyword of that bucket found}
         """
-        message_lower = message.lower()
-        
-        # Check for critical emergencies
-        for keyword in self.emergency_keywords:
-            if keyword in message_lower:
-                return {
-                    "is_emergency": True,
-                    "severity": "CRITICAL",
-                    "matched_keyword": keyword,
-                    "response": self._get_emergency_response(),
-                    "metadata": {
-                        "rule_triggered": "emergency_detection",
-                        "response_type": "rule_based"
-                    }
-                }
-        
-        # Check for urgent situations
-        for keyword in self.urgent_keywords:
-            if keyword in message_lower:
-                return {
-                    "is_emergency": True,
-                    "severity": "URGENT",
-                    "matched_keyword": keyword,
-                    "response": self._get_urgent_response(),
-                    "metadata": {
-                        "rule_triggered": "urgent_detection",
-                        "response_type": "rule_based"
-                    }
-                }
-        
-        return {
-            "is_emergency": False,
-            "severity": None,
-            "matched_keyword": None,
-            "response": None,
-            "metadata": None
-        }
+        found = {}
+        for match in self._SCANNER.finditer(message):
+            for name, text in match.groupdict().items():
+                if text is None:
+                    continue
+                keyword = text.lower()
+                rank = self._RANK.get((name, keyword))
+                if rank is None:
+                    # Case-folding-only match (e.g. long s) - lower() never matched these
+                    continue
+                if name not in found or rank < found[name][0]:
+                    found[name] = (rank, keyword)
+        return {name: keyword for name, (_, keyword) in found.items()}
     
-    def check_inappropriate_request(self, message: str) -> Optional[Dict]:
+    def classify(self, message: str) -> Optional[Dict]:
         """
-        Check if user is asking for diagnosis or prescription
-        Returns warning response if detected
+        Run all rule-based checks at once, cheapest first
+        
+        Lowercases the message once, answers greetings with an anchored
+        regex match, otherwise scans every keyword bucket in a single pass.
+        Returns the highest-priority hit as {"category", "matched_keyword",
+        "response", "metadata"}, or None if the message may go to AI.
         """
-        message_lower = message.lower()
+        text = message.lower().strip()
         
-        # Check for diagnosis requests
-        for keyword in self.diagnosis_keywords:
-            if keyword in message_lower:
-                return {
-                    "is_inappropriate": True,
-                    "type": "diagnosis_request",
-                    "response": self._get_diagnosis_warning(),
-                    "metadata": {
-                        "rule_triggered": "diagnosis_prevention",
-                        "response_type": "rule_based"
-                    }
-                }
+        # Greetings: the common, cheapest case
+        if self._GREETING_RE.match(text):
+            return self._reply("greeting", None)
         
-        # Check for prescription requests
-        for keyword in self.prescription_keywords:
-            if keyword in message_lower:
-                return {
-                    "is_inappropriate": True,
-                    "type": "prescription_request",
-                    "response": self._get_prescription_warning(),
-                    "metadata": {
-                        "rule_triggered": "prescription_prevention",
-                        "response_type": "rule_based"
-                    }
-                }
+        # Emergencies, urgent situations, then diagnosis/prescription requests
+        found = self._scan(text)
+        for category, _ in self._BUCKETS:
+            keyword = found.get(category)
+            if keyword:
+                return self._reply(category, keyword)
         
         return None
     
+    def _reply(self, category: str, keyword: Optional[str]) -> Dict:
+        """Payload for a rule hit, from the RULE_REPLIES table"""
+        get_response, metadata = RULE_REPLIES[category]
+        return {
+            "category": category,
+            "matched_keyword": keyword,
+            "response": get_response(self),
+            "metadata": dict(metadata)
+        }
+    
     def _get_emergency_response(self) -> str:
         """Emergency response template"""
         return """🚨 **MEDICAL EMERGENCY DETECTED**
@@ -193,12 +206,6 @@ Would you like to book a consultation?"""
 
 Would you like help booking an appointment with a doctor?"""
     
-    def is_greeting(self, message: str) -> bool:
-        """Check if message is a simple greeting"""
-        greetings = ["hi", "hello", "hey", "good morning", "good evening", "good afternoon"]
-        message_lower = message.lower().strip()
-        return message_lower in greetings or any(message_lower.startswith(g) for g in greetings)
-    
     def get_greeting_response(self) -> str:
         """Friendly greeting response"""
         return """Hello! 👋 I'm your Health Nova assistant.
@@ -215,5 +222,37 @@ I'm here to help you with:
 How can I assist you today?"""
 
 
+# Reply for each rule category: (response getter, metadata)
+# The single source of every rule-based payload - classify() only picks the category
+RULE_REPLIES = {
+    "greeting": (SafetyChecker.get_greeting_response, {
+        "response_type": "rule_based",
+        "rule_triggered": "greeting"
+    }),
+    "emergency": (SafetyChecker._get_emergency_response, {
+        "rule_triggered": "emergency_detection",
+        "response_type": "rule_based",
+        "safety_check": "emergency",
+        "severity": "CRITICAL"
+    }),
+    "urgent": (SafetyChecker._get_urgent_response, {
+        "rule_triggered": "urgent_detection",
+        "response_type": "rule_based",
+        "safety_check": "emergency",
+        "severity": "URGENT"
+    }),
+    "diagnosis": (SafetyChecker._get_diagnosis_warning, {
+        "rule_triggered": "diagnosis_prevention",
+        "response_type": "rule_based",
+        "safety_check": "inappropriate"
+    }),
+    "prescription": (SafetyChecker._get_prescription_warning, {
+        "rule_triggered": "prescription_prevention",
+        "response_type": "rule_based",
+        "safety_check": "inappropriate"
+    })
+}
+
+
 # Singleton instance
 safety_checker = SafetyChecker()
@@ -0,0 +1,140 @@
+"""
+Semantic Cache Module
+Caches Gemini replies so repeated (or trivially re-worded) questions skip
+the API call
+
+- CacheKey: normalizes the question (case, surrounding/repeated whitespace)
+  and hashes it together with the system prompt and retrieved context
+- CacheEntry: cached text with its expiry time and size
+- SmartRAGCache: thread-safe LRU bounded by total size and entry count,
+  with a TTL per entry and collapsing of concurrent identical misses
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+_SPACE_RE = re.compile(r'\s+')
+
+
+class CacheKey:
+    """Builds cache keys for chatbot replies"""
+    
+    @staticmethod
+    def normalize(message: str) -> str:
+        """Lowercase, strip and collapse whitespace"""
+        return _SPACE_RE.sub(' ', message.strip().lower())
+    
+    @classmethod
+    def build(cls, system_prompt: str, context: str, message: str) -> bytes:
+        """SHA-256 over (system prompt, context, normalized message)"""
+        digest = hashlib.sha256()
+        for part in (system_prompt, context, cls.normalize(message)):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\x1f')  # separator so parts can't run together
+        return digest.digest()
+
+
+class CacheEntry:
+    """One cached reply"""
+    
+    __slots__ = ('value', 'expires_at', 'size_bytes')
+    
+    def __init__(self, value: str, ttl_seconds: float):
+        self.value = value
+        self.expires_at = time.monotonic() + ttl_seconds
+        self.size_bytes = len(value.encode('utf-8'))
+    
+    def is_fresh(self) -> bool:
+        return self.expires_at > time.monotonic()
+
+
+class SmartRAGCache:
+    """
+    LRU + TTL cache for AI replies
+    
+    get_or_compute() also collapses concurrent misses: while one caller is
+    computing a key, others asking for the same key wait for its result
+    instead of firing their own API call.
+    """
+    
+    def __init__(self, max_bytes: int = 100 * 1024 * 1024, max_entries: int = 10000,
+                 ttl_seconds: float = 3600, wait_timeout: float = 60):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.wait_timeout = wait_timeout
+        self._data: "OrderedDict[bytes, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._inflight: Dict[bytes, threading.Event] = {}
+        self._lock = threading.Lock()
+    
+    def _get_locked(self, key: bytes) -> Optional[str]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if not entry.is_fresh():
+            self._bytes -= entry.size_bytes
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry.value
+    
+    def get(self, key: bytes) -> Optional[str]:
+        """Return the cached reply for key, or None if missing/expired"""
+        with self._lock:
+            return self._get_locked(key)
+    
+    def set(self, key: bytes, value: str) -> None:
+        """Store a reply, evicting least recently used entries past the limits"""
+        entry = CacheEntry(value, self.ttl_seconds)
+        if entry.size_bytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size_bytes
+            self._data[key] = entry
+            self._bytes += entry.size_bytes
+            while self._bytes > self.max_bytes or len(self._data) > self.max_entries:
+                _, evicted = self._data.popitem(last=False)
+                self._bytes -= evicted.size_bytes
+    
+    def get_or_compute(self, key: bytes, compute: Callable[[], str]) -> str:
+        """Return the cached reply for key, or compute, store and return it"""
+        while True:
+            with self._lock:
+                value = self._get_locked(key)
+                if value is not None:
+                    return value
+                
+                pending = self._inflight.get(key)
+                if pending is None:
+                    # This caller computes the value
+                    pending = self._inflight[key] = threading.Event()
+                    break
+            
+            # Someone else is computing it - wait, then re-check the cache
+            # (if they failed, the next loop makes this caller compute)
+            pending.wait(self.wait_timeout)
+        
+        try:
+            value = compute()
+            self.set(key, value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.set()
+    
+    def clear(self):
+        """Drop all cached entries (e.g. after the knowledge base changes)"""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+
+# Singleton instance for Gemini replies
+semantic_cache = SmartRAGCache()
@@ -1,5 +1,6 @@
 import os
 from datetime import timedelta
+from sqlalchemy.engine import make_url
 
 class Config:
     """Base configuration"""
@@ -12,15 +13,55 @@ class Config:
     SQLALCHEMY_DATABASE_URI = db_url if db_url else 'sqlite:///rural_health.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Engine options forwarded to create_engine by Flask-SQLAlchemy
+    # - insertmanyvalues_page_size: rows per multi-row INSERT for bulk inserts
+    # - pool_pre_ping / pool_recycle: drop stale connections before use
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'insertmanyvalues_page_size': 1000,
+        'pool_pre_ping': True,
+        'pool_recycle': 1800
+    }
+    
+    # Connection pool sizing for server databases (SocketIO signaling + API)
+    # LIFO reuses the warmest connection and lets idle overflow time out
+    if not SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        SQLALCHEMY_ENGINE_OPTIONS.update({
+            'pool_size': 20,
+            'max_overflow': 30,
+            'pool_timeout': 30,
+            'pool_use_lifo': True
+        })
+    
+    # psycopg2 only: also batch executemany UPDATE/DELETE (execute_batch)
+    # INSERT batching is already covered by insertmanyvalues_page_size above
+    if make_url(SQLALCHEMY_DATABASE_URI).get_driver_name() == 'psycopg2':
+        SQLALCHEMY_ENGINE_OPTIONS.update({
+            'executemany_mode': 'values_plus_batch',
+            'executemany_batch_page_size': 500
+        })
+    
     # Session configuration
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
+    # Only send Set-Cookie when the session actually changes (login/logout),
+    # not on every authenticated read
+    SESSION_REFRESH_EACH_REQUEST = False
+    
+    # CORS allow-list (comma-separated) for the REST API and SocketIO handshake
+    # A fixed set keeps the per-request origin check a simple membership test
+    ALLOWED_ORIGINS = frozenset(
+        origin.strip() for origin in os.environ.get(
+            'ALLOWED_ORIGINS', 'http://127.0.0.1:5000,http://localhost:5000'
+        ).split(',') if origin.strip()
+    )
     
     # File upload configuration (for lab reports)
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads')
-    ALLOWED_EXTENSIONS = {'pdf', 'jpg', 'jpeg', 'png'}
+    ALLOWED_EXTENSIONS = frozenset({'pdf', 'jpg', 'jpeg', 'png'})
+    # For filename.lower().endswith(ALLOWED_SUFFIXES) in utils.helpers.allowed_file - no split needed
+    ALLOWED_SUFFIXES = tuple(sorted(f'.{ext}' for ext in ALLOWED_EXTENSIONS))
     
     # Razorpay payment gateway configuration
     # WHY ENVIRONMENT VARIABLES: Never hardcode API keys in code
@@ -34,6 +75,10 @@ class Config:
     # Get your API key from: https://aistudio.google.com/app/apikey
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
     
+    # /chatbot/chat/batch exists for chatbot/test_chatbot.py only: one request
+    # fans out to many Gemini calls, so it is off unless explicitly enabled
+    CHATBOT_BATCH_ENABLED = os.environ.get('CHATBOT_BATCH_ENABLED', '').lower() in ('1', 'true', 'yes')
+    
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -1,6 +1,9 @@
 from flask import Blueprint, request, jsonify, session, send_from_directory
+from sqlalchemy import case, distinct, func, select
+from sqlalchemy.orm import joinedload, raiseload, selectinload
 from models import db, User, PatientProfile, Visit, LabTest, Prescription
 from auth.decorators import role_required
+from utils.helpers import etag_cache, get_page_args, MAX_PER_PAGE
 from datetime import datetime
 import os
 from utils.medical_history import (
@@ -13,6 +16,9 @@ from utils.medical_history import (
 
 doctor_bp = Blueprint('doctor', __name__)
 
+# Fields a prescription entry in a batch must have to be saved
+_RX_REQUIRED = frozenset(('medication_name', 'dosage', 'frequency', 'duration'))
+
 
 # ============================================================================
 # SECURITY: Protected Doctor Chatbot Page
@@ -50,58 +56,64 @@ def doctor_chatbot_page():
 
 @doctor_bp.route('/dashboard', methods=['GET'])
 @role_required('doctor')
+@etag_cache
 def dashboard():
     """Get doctor dashboard overview"""
     doctor_id = session.get('user_id')
     
-    # Get assigned patients (through visits)
-    assigned_visits = Visit.query.filter_by(doctor_id=doctor_id).all()
-    patient_ids = list(set([v.patient_profile_id for v in assigned_visits]))
-    
-    # Get pending visits
-    pending_visits = Visit.query.filter_by(
-        doctor_id=doctor_id,
-        status='pending'
-    ).order_by(Visit.created_at.desc()).all()
-    
-    # Get in-progress visits
-    in_progress_visits = Visit.query.filter_by(
-        doctor_id=doctor_id,
-        status='in_progress'
-    ).order_by(Visit.created_at.desc()).all()
+    # Totals without loading every visit row
+    total_visits, total_patients = db.session.execute(
+        select(func.count(Visit.id), func.count(distinct(Visit.patient_profile_id)))
+        .where(Visit.doctor_id == doctor_id)
+    ).one()
+    
+    # Pending and in-progress visits in one query, split by status
+    open_visits = db.session.execute(
+        select(Visit)
+        .where(Visit.doctor_id == doctor_id, Visit.status.in_(('pending', 'in_progress')))
+        .order_by(Visit.created_at.desc())
+    ).scalars().all()
+    pending_visits = [visit for visit in open_visits if visit.status == 'pending']
+    in_progress_visits = [visit for visit in open_visits if visit.status == 'in_progress']
     
     return jsonify({
         'status': 'success',
         'data': {
-            'total_patients': len(patient_ids),
+            'total_patients': total_patients,
             'pending_visits': [visit.to_dict() for visit in pending_visits],
             'in_progress_visits': [visit.to_dict() for visit in in_progress_visits],
-            'total_visits': len(assigned_visits)
+            'total_visits': total_visits
         }
     }), 200
 
 
 @doctor_bp.route('/patients', methods=['GET'])
 @role_required('doctor')
+@etag_cache
 def get_patients():
     """Get all assigned patients"""
     doctor_id = session.get('user_id')
     
-    # Get unique patient profiles from assigned visits
-    visits = Visit.query.filter_by(doctor_id=doctor_id).all()
-    patient_profile_ids = list(set([v.patient_profile_id for v in visits]))
+    # One statement: each assigned patient's profile + user, with the number
+    # of visits with this doctor (aggregated in a subquery)
+    visit_counts = select(
+        Visit.patient_profile_id,
+        func.count(Visit.id).label('total_visits')
+    ).where(Visit.doctor_id == doctor_id).group_by(Visit.patient_profile_id).subquery()
+    
+    rows = db.session.execute(
+        select(PatientProfile, visit_counts.c.total_visits)
+        .join(visit_counts, visit_counts.c.patient_profile_id == PatientProfile.id)
+        .options(joinedload(PatientProfile.user))
+        .order_by(PatientProfile.id)
+    ).all()
     
     patients = []
-    for profile_id in patient_profile_ids:
-        profile = PatientProfile.query.get(profile_id)
-        if profile:
-            patient_data = profile.to_dict()
-            patient_data['user'] = profile.user.to_dict()
-            patient_data['total_visits'] = Visit.query.filter_by(
-                patient_profile_id=profile_id,
-                doctor_id=doctor_id
-            ).count()
-            patients.append(patient_data)
+    for profile, total_visits in rows:
+        patient_data = profile.to_dict()
+        patient_data['user'] = profile.user.to_dict()
+        patient_data['total_visits'] = total_visits
+        patients.append(patient_data)
     
     return jsonify({
         'status': 'success',
@@ -122,19 +134,16 @@ def get_patient_details(patient_profile_id):
     doctor_id = session.get('user_id')
     
     # Verify doctor has access to this patient (must have at least one assigned visit)
-    has_access = Visit.query.filter_by(
-        doctor_id=doctor_id,
-        patient_profile_id=patient_profile_id
-    ).first()
-    
-    if not has_access:
+    if not validate_doctor_access(doctor_id, patient_profile_id):
         return jsonify({
             'status': 'error',
             'message': 'Access denied. Patient not assigned to you'
         }), 403
     
-    # Get patient profile
-    patient_profile = PatientProfile.query.get(patient_profile_id)
+    # Get patient profile (with its user, serialized below)
+    patient_profile = db.session.get(
+        PatientProfile, patient_profile_id, options=[joinedload(PatientProfile.user)]
+    )
     
     if not patient_profile:
         return jsonify({
@@ -144,16 +153,28 @@ def get_patient_details(patient_profile_id):
     
     # Get ALL visits for this patient ordered by date (latest first)
     # This provides complete medical history timeline
-    visits = Visit.query.filter_by(
+    # Everything the history below reads is loaded up front (a fixed number
+    # of queries); raiseload turns any other lazy load into an error
+    # instead of a silent query per visit
+    visits = Visit.query.options(
+        joinedload(Visit.doctor),
+        selectinload(Visit.lab_tests).selectinload(LabTest.reports),
+        selectinload(Visit.lab_tests).joinedload(LabTest.lab),
+        selectinload(Visit.prescriptions),
+        raiseload('*')
+    ).filter_by(
         patient_profile_id=patient_profile_id
     ).order_by(Visit.visit_date.desc()).all()
     
     # Build comprehensive history with all details
     history = []
+    my_visits_count = 0
     for visit in visits:
+        is_my_visit = visit.doctor_id == doctor_id
+        my_visits_count += is_my_visit
         visit_data = visit.to_dict()
         visit_data['doctor_name'] = visit.doctor.full_name if visit.doctor else 'Not assigned'
-        visit_data['is_my_visit'] = visit.doctor_id == doctor_id
+        visit_data['is_my_visit'] = is_my_visit
         visit_data['lab_tests'] = [test.to_dict(include_reports=True) for test in visit.lab_tests]
         visit_data['prescriptions'] = [rx.to_dict() for rx in visit.prescriptions]
         history.append(visit_data)
@@ -162,7 +183,7 @@ def get_patient_details(patient_profile_id):
     patient_data['user'] = patient_profile.user.to_dict()
     patient_data['complete_history'] = history  # Entire medical timeline
     patient_data['total_visits'] = len(visits)
-    patient_data['my_visits_count'] = len([v for v in visits if v.doctor_id == doctor_id])
+    patient_data['my_visits_count'] = my_visits_count
     
     return jsonify({
         'status': 'success',
@@ -173,8 +194,9 @@ def get_patient_details(patient_profile_id):
 @doctor_bp.route('/visits', methods=['GET'])
 @role_required('doctor')
 def get_visits():
-    """Get all visits assigned to doctor"""
+    """Get visits assigned to doctor, newest first (paginated: page, per_page <= 100)"""
     doctor_id = session.get('user_id')
+    page, per_page = get_page_args()
     
     # Optional status filter
     status = request.args.get('status')
@@ -184,13 +206,22 @@ def get_visits():
     if status:
         query = query.filter_by(status=status)
     
-    visits = query.order_by(Visit.created_at.desc()).all()
+    total = query.with_entities(func.count(Visit.id)).scalar()
+    visits = query.options(
+        joinedload(Visit.doctor),
+        selectinload(Visit.lab_tests).joinedload(LabTest.lab),
+        selectinload(Visit.prescriptions)
+    ).order_by(
+        Visit.created_at.desc(), Visit.id.desc()
+    ).limit(per_page).offset((page - 1) * per_page).all()
     
     return jsonify({
         'status': 'success',
         'data': {
             'visits': [visit.to_dict(include_details=True) for visit in visits],
-            'total': len(visits)
+            'total': total,
+            'page': page,
+            'per_page': per_page
         }
     }), 200
 
@@ -201,8 +232,12 @@ def get_visit(visit_id):
     """Get specific visit details"""
     doctor_id = session.get('user_id')
     
-    # Get visit and verify doctor has access
-    visit = Visit.query.filter_by(id=visit_id, doctor_id=doctor_id).first()
+    # Get visit and verify doctor has access (with what include_details reads)
+    visit = Visit.query.options(
+        joinedload(Visit.doctor),
+        selectinload(Visit.lab_tests).joinedload(LabTest.lab),
+        selectinload(Visit.prescriptions)
+    ).filter_by(id=visit_id, doctor_id=doctor_id).first()
     
     if not visit:
         return jsonify({
@@ -216,6 +251,14 @@ def get_visit(visit_id):
     }), 200
 
 
+def _appended(column, text, timestamp):
+    """SQL value for an append-only field: the text if empty, else existing text + timestamped entry"""
+    return case(
+        (func.coalesce(column, '') == '', text),
+        else_=column + f"\n\n[{timestamp}] {text}"
+    )
+
+
 @doctor_bp.route('/visits/<int:visit_id>/diagnose', methods=['PUT'])
 @role_required('doctor')
 def diagnose_visit(visit_id):
@@ -244,20 +287,19 @@ def diagnose_visit(visit_id):
     data = request.get_json()
     
     try:
-        # Add diagnosis and notes (only if not already set)
+        # Add diagnosis and notes (set if empty, otherwise append with timestamp)
+        timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M')
+        appended = {}
         if 'diagnosis' in data and data['diagnosis']:
-            if not visit.diagnosis:  # Only set if empty
-                visit.diagnosis = data['diagnosis']
-            else:
-                # Append to existing diagnosis with timestamp
-                visit.diagnosis += f"\n\n[{datetime.utcnow().strftime('%Y-%m-%d %H:%M')}] {data['diagnosis']}"
+            appended[Visit.diagnosis] = _appended(Visit.diagnosis, data['diagnosis'], timestamp)
         
         if 'notes' in data and data['notes']:
-            if not visit.notes:
-                visit.notes = data['notes']
-            else:
-                # Append to existing notes
-                visit.notes += f"\n\n[{datetime.utcnow().strftime('%Y-%m-%d %H:%M')}] {data['notes']}"
+            appended[Visit.notes] = _appended(Visit.notes, data['notes'], timestamp)
+        
+        if appended:
+            # Concatenated in the UPDATE itself, so concurrent edits cannot overwrite each other
+            Visit.query.filter_by(id=visit_id).update(appended, synchronize_session=False)
+            db.session.expire(visit, ['diagnosis', 'notes'])
         
         if 'severity' in data and data['severity'] in ['low', 'medium', 'high', 'critical']:
             visit.severity = data['severity']
@@ -272,32 +314,32 @@ def diagnose_visit(visit_id):
         
         # Add prescriptions if provided (append-only)
         if 'prescriptions' in data and isinstance(data['prescriptions'], list):
-            for rx_data in data['prescriptions']:
-                # Validate required prescription fields
-                required_fields = ['medication_name', 'dosage', 'frequency', 'duration']
-                if all(field in rx_data for field in required_fields):
-                    prescription = Prescription(
-                        visit_id=visit_id,
-                        medication_name=rx_data['medication_name'],
-                        dosage=rx_data['dosage'],
-                        frequency=rx_data['frequency'],
-                        duration=rx_data['duration'],
-                        instructions=rx_data.get('instructions')
-                    )
-                    db.session.add(prescription)
+            db.session.add_all([
+                Prescription(
+                    visit_id=visit_id,
+                    medication_name=rx_data['medication_name'],
+                    dosage=rx_data['dosage'],
+                    frequency=rx_data['frequency'],
+                    duration=rx_data['duration'],
+                    instructions=rx_data.get('instructions')
+                )
+                for rx_data in data['prescriptions']
+                if _RX_REQUIRED.issubset(rx_data)
+            ])
         
         # Add lab test requests if provided
         if 'lab_tests' in data and isinstance(data['lab_tests'], list):
-            for test_data in data['lab_tests']:
-                if 'test_name' in test_data:
-                    lab_test = LabTest(
-                        visit_id=visit_id,
-                        test_name=test_data['test_name'],
-                        test_type=test_data.get('test_type'),
-                        instructions=test_data.get('instructions'),
-                        status='requested'
-                    )
-                    db.session.add(lab_test)
+            db.session.add_all([
+                LabTest(
+                    visit_id=visit_id,
+                    test_name=test_data['test_name'],
+                    test_type=test_data.get('test_type'),
+                    instructions=test_data.get('instructions'),
+                    status='requested'
+                )
+                for test_data in data['lab_tests']
+                if 'test_name' in test_data
+            ])
         
         db.session.commit()
         
@@ -456,16 +498,18 @@ def complete_visit(visit_id):
 
 @doctor_bp.route('/patients/<int:patient_profile_id>/timeline', methods=['GET'])
 @role_required('doctor')
+@etag_cache
 def get_patient_medical_timeline(patient_profile_id):
     """
     Get complete medical history timeline for a patient
     Digital replacement for physical patient files
     
     Query params:
-        limit: Number of visits to return (default: all)
+        page: Page number (default: 1)
+        per_page: Visits per page (default and max: 100; 'limit' is accepted too)
     
     Returns:
-        Complete chronological medical history ordered by date (newest first)
+        Chronological medical history ordered by date (newest first)
     """
     doctor_id = session.get('user_id')
     
@@ -485,19 +529,21 @@ def get_patient_medical_timeline(patient_profile_id):
             'message': 'Patient profile not found'
         }), 404
     
-    # Get limit from query params
-    limit = request.args.get('limit', type=int)
+    # 'limit' is the older name for per_page
+    page, per_page = get_page_args(request.args.get('limit', MAX_PER_PAGE, type=int))
     
-    # Get patient summary and complete timeline
+    # Get patient summary and one page of the timeline
     patient_summary = get_patient_summary(patient_profile)
-    timeline = get_patient_timeline(patient_profile_id, limit=limit)
+    timeline = get_patient_timeline(patient_profile_id, limit=per_page, offset=(page - 1) * per_page)
     
     return jsonify({
         'status': 'success',
         'data': {
             'patient': patient_summary,
             'timeline': timeline,
-            'total_visits': len(timeline) if not limit else patient_summary['total_visits']
+            'total_visits': patient_summary['total_visits'],
+            'page': page,
+            'per_page': per_page
         }
     }), 200
 
@@ -558,30 +604,32 @@ def add_medical_history_entry(patient_profile_id):
         
         # Add prescriptions if provided
         if data.get('prescriptions') and isinstance(data['prescriptions'], list):
-            for rx_data in data['prescriptions']:
-                if all(k in rx_data for k in ['medication_name', 'dosage', 'frequency', 'duration']):
-                    prescription = Prescription(
-                        visit_id=visit.id,
-                        medication_name=rx_data['medication_name'],
-                        dosage=rx_data['dosage'],
-                        frequency=rx_data['frequency'],
-                        duration=rx_data['duration'],
-                        instructions=rx_data.get('instructions')
-                    )
-                    db.session.add(prescription)
+            db.session.add_all([
+                Prescription(
+                    visit_id=visit.id,
+                    medication_name=rx_data['medication_name'],
+                    dosage=rx_data['dosage'],
+                    frequency=rx_data['frequency'],
+                    duration=rx_data['duration'],
+                    instructions=rx_data.get('instructions')
+                )
+                for rx_data in data['prescriptions']
+                if _RX_REQUIRED.issubset(rx_data)
+            ])
         
         # Add lab tests if provided
         if data.get('lab_tests') and isinstance(data['lab_tests'], list):
-            for test_data in data['lab_tests']:
-                if test_data.get('test_name'):
-                    lab_test = LabTest(
-                        visit_id=visit.id,
-                        test_name=test_data['test_name'],
-                        test_type=test_data.get('test_type'),
-                        instructions=test_data.get('instructions'),
-                        status='requested'
-                    )
-                    db.session.add(lab_test)
+            db.session.add_all([
+                LabTest(
+                    visit_id=visit.id,
+                    test_name=test_data['test_name'],
+                    test_type=test_data.get('test_type'),
+                    instructions=test_data.get('instructions'),
+                    status='requested'
+                )
+                for test_data in data['lab_tests']
+                if test_data.get('test_name')
+            ])
         
         db.session.commit()
         
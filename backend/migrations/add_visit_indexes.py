@@ -0,0 +1,68 @@
+"""
+Database migration script to add query indexes for visits, lab tests and prescriptions
+Run this after updating the models.py file
+
+Usage:
+    python migrations/add_visit_indexes.py
+"""
+
+from app import create_app, db
+from models import Visit, LabTest, Prescription
+from sqlalchemy import text
+
+# Tables whose model-declared indexes should exist
+MODELS = (Visit, LabTest, Prescription)
+
+
+def upgrade():
+    """Create the model indexes that are missing (create_all skips existing tables)"""
+    app, _ = create_app('development')
+    
+    with app.app_context():
+        try:
+            for model in MODELS:
+                table = model.__table__
+                for index in table.indexes:
+                    columns = ', '.join(column.name for column in index.columns)
+                    if db.engine.dialect.name == 'postgresql':
+                        # CONCURRENTLY: no write lock on the table; cannot run in a transaction
+                        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+                            conn.execute(text(
+                                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index.name} "
+                                f"ON {table.name} ({columns})"
+                            ))
+                    else:
+                        with db.engine.begin() as conn:
+                            conn.execute(text(
+                                f"CREATE INDEX IF NOT EXISTS {index.name} ON {table.name} ({columns})"
+                            ))
+                    print(f"✓ Index {index.name} on {table.name} ({columns})")
+            
+            print("\n✓ Migration completed successfully!")
+        
+        except Exception as e:
+            print(f"\n✗ Migration failed: {str(e)}")
+
+def downgrade():
+    """Drop the indexes (for rollback)"""
+    app, _ = create_app('development')
+    
+    with app.app_context():
+        try:
+            with db.engine.begin() as conn:
+                for model in MODELS:
+                    for index in model.__table__.indexes:
+                        conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+            
+            print("✓ Rollback completed successfully!")
+        
+        except Exception as e:
+            print(f"✗ Rollback failed: {str(e)}")
+
+if __name__ == '__main__':
+    import sys
+    
+    if len(sys.argv) > 1 and sys.argv[1] == 'downgrade':
+        downgrade()
+    else:
+        upgrade()
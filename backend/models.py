@@ -87,6 +87,12 @@ class PatientProfile(db.Model):
 class Visit(db.Model):
     """Each health issue creates a new visit - append-only history"""
     __tablename__ = 'visits'
+    __table_args__ = (
+        # Doctor dashboards / visit lists filter on (doctor_id, status), newest first
+        db.Index('ix_visits_doctor_status_created', 'doctor_id', 'status', 'created_at'),
+        # Patient history / timeline: all visits of a patient by visit_date
+        db.Index('ix_visits_patient_visit_date', 'patient_profile_id', 'visit_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     patient_profile_id = db.Column(db.Integer, db.ForeignKey('patient_profiles.id'), nullable=False)
@@ -139,7 +145,7 @@ class LabTest(db.Model):
     __tablename__ = 'lab_tests'
     
     id = db.Column(db.Integer, primary_key=True)
-    visit_id = db.Column(db.Integer, db.ForeignKey('visits.id'), nullable=False)
+    visit_id = db.Column(db.Integer, db.ForeignKey('visits.id'), nullable=False, index=True)
     lab_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)  # Assigned lab
     
     # Test information
@@ -218,7 +224,7 @@ class Prescription(db.Model):
     __tablename__ = 'prescriptions'
     
     id = db.Column(db.Integer, primary_key=True)
-    visit_id = db.Column(db.Integer, db.ForeignKey('visits.id'), nullable=False)
+    visit_id = db.Column(db.Integer, db.ForeignKey('visits.id'), nullable=False, index=True)
     
     medication_name = db.Column(db.String(200), nullable=False)
     dosage = db.Column(db.String(100), nullable=False)  # e.g., "500mg"
@@ -279,6 +285,12 @@ class Message(db.Model):
 class Appointment(db.Model):
     """Appointments between patients and doctors with video consultation support"""
     __tablename__ = 'appointments'
+    __table_args__ = (
+        # Slot lookups / existence checks filter on (doctor_id, appointment_date)
+        db.Index('ix_appointments_doctor_date', 'doctor_id', 'appointment_date'),
+        # Patient dashboards filter on (patient_id, status)
+        db.Index('ix_appointments_patient_status', 'patient_id', 'status'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     patient_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
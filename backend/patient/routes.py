@@ -1,25 +1,30 @@
 from flask import Blueprint, request, jsonify, session, render_template, redirect, url_for
+from sqlalchemy import func
 from models import db, User, PatientProfile, Visit, LabTest, Prescription
 from auth.decorators import role_required
+from utils.helpers import get_page_args, MAX_PER_PAGE
 from datetime import datetime
 from utils.medical_history import get_patient_timeline, get_patient_summary
 from utils.ai_helper import get_ai_guidance, get_symptom_summary
 
 patient_bp = Blueprint('patient', __name__, template_folder='../../frontend/patient')
 
+# Where unauthenticated UI requests are sent
+_LOGIN_PAGE = '/login.html'
+
 
 @patient_bp.route('/dashboard', methods=['GET'])
 def dashboard():
     """Render patient dashboard HTML page"""
     # Check authentication manually for UI route
     if 'user_id' not in session or session.get('role') != 'patient':
-        return redirect('/login.html')
+        return redirect(_LOGIN_PAGE)
     
     user_id = session.get('user_id')
     user = User.query.get(user_id)
     
     if not user:
-        return redirect('/login.html')
+        return redirect(_LOGIN_PAGE)
     
     # Render the dashboard HTML (data will be loaded via JS)
     return render_template('dashboard.html', user=user)
@@ -51,13 +56,18 @@ def dashboard_data():
         LabTest.status.in_(['requested', 'approved', 'scheduled'])
     ).all()
     
+    # Counted in SQL - the visit rows themselves are not needed
+    total_visits = db.session.query(func.count(Visit.id)).filter(
+        Visit.patient_profile_id == patient_profile.id
+    ).scalar()
+    
     return jsonify({
         'status': 'success',
         'data': {
             'profile': patient_profile.to_dict(),
             'recent_visits': [visit.to_dict() for visit in recent_visits],
             'pending_lab_tests': [test.to_dict() for test in pending_lab_tests],
-            'total_visits': len(patient_profile.visits)
+            'total_visits': total_visits
         }
     }), 200
 
@@ -362,10 +372,11 @@ def get_medical_timeline():
     Digital medical record - replaces physical files
     
     Query params:
-        limit: Number of visits to return (default: all)
+        page: Page number (default: 1)
+        per_page: Visits per page (default and max: 100; 'limit' is accepted too)
     
     Returns:
-        Complete chronological medical history ordered by date (newest first)
+        Chronological medical history ordered by date (newest first)
     """
     user_id = session.get('user_id')
     patient_profile = PatientProfile.query.filter_by(user_id=user_id).first()
@@ -376,19 +387,21 @@ def get_medical_timeline():
             'message': 'Patient profile not found'
         }), 404
     
-    # Get limit from query params
-    limit = request.args.get('limit', type=int)
+    # 'limit' is the older name for per_page
+    page, per_page = get_page_args(request.args.get('limit', MAX_PER_PAGE, type=int))
     
-    # Get patient summary and complete timeline
+    # Get patient summary and one page of the timeline
     patient_summary = get_patient_summary(patient_profile)
-    timeline = get_patient_timeline(patient_profile.id, limit=limit)
+    timeline = get_patient_timeline(patient_profile.id, limit=per_page, offset=(page - 1) * per_page)
     
     return jsonify({
         'status': 'success',
         'data': {
             'patient': patient_summary,
             'timeline': timeline,
-            'total_visits': len(timeline) if not limit else patient_summary['total_visits']
+            'total_visits': patient_summary['total_visits'],
+            'page': page,
+            'per_page': per_page
         }
     }), 200
 
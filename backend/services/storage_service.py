@@ -34,20 +34,25 @@ logger = logging.getLogger(__name__)
 
 # MIME type whitelist - ONLY these are allowed
 # Why whitelist vs blacklist? Blacklists can be bypassed; whitelists cannot.
-ALLOWED_MIMETYPES = {
+ALLOWED_MIMETYPES = frozenset({
     'application/pdf',      # Lab reports
     'image/jpeg',           # Medical photos
     'image/png',            # Screenshots, medical images
     'image/jpg'             # Alternative JPEG MIME
-}
+})
 
 # Extension whitelist (double-check MIME validation)
-ALLOWED_EXTENSIONS = {'.pdf', '.jpg', '.jpeg', '.png'}
+ALLOWED_EXTENSIONS = frozenset({'.pdf', '.jpg', '.jpeg', '.png'})
 
 # File size limits (in bytes)
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 MIN_FILE_SIZE = 100  # 100 bytes (prevent empty file uploads)
 
+# Copy uploads to disk in 64KB chunks (fewer read/write calls than the 16KB
+# default). Werkzeug keeps multipart files up to 500KB in memory and spools
+# larger ones to a temp file before the view runs
+STREAM_UPLOAD_CHUNK = 64 * 1024
+
 
 class StorageService:
     """
@@ -205,8 +210,8 @@ class StorageService:
                     'code': 'SECURITY_SCAN_FAILED'
                 }
             
-            # SAVE FILE: Write to disk
-            file.save(str(file_path))
+            # SAVE FILE: Stream to disk chunk by chunk
+            file.save(str(file_path), buffer_size=STREAM_UPLOAD_CHUNK)
             
             # Verify file was written successfully
             if not file_path.exists() or file_path.stat().st_size != file_size:
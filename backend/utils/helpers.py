@@ -1,6 +1,10 @@
-from flask import session
+from functools import wraps
+from flask import make_response, request, session
+from config import Config
 from models import User
 
+MAX_PER_PAGE = 100
+
 
 def get_current_user():
     """Get current logged-in user from session"""
@@ -34,7 +38,35 @@ def validate_required_fields(data, required_fields):
     return missing_fields
 
 
-def allowed_file(filename, allowed_extensions):
-    """Check if file extension is allowed"""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in allowed_extensions
+def allowed_file(filename, allowed_suffixes=Config.ALLOWED_SUFFIXES):
+    """Check if file extension is allowed (allowed_suffixes: a tuple like ('.pdf', '.png'))"""
+    return filename.lower().endswith(allowed_suffixes)
+
+
+def get_page_args(default_per_page=MAX_PER_PAGE):
+    """Read page/per_page from the query string (page >= 1, per_page capped at MAX_PER_PAGE)"""
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = request.args.get('per_page', default_per_page, type=int)
+    return page, min(max(per_page, 1), MAX_PER_PAGE)
+
+
+def etag_cache(f):
+    """
+    Answer repeat GETs with 304 Not Modified while the JSON body is unchanged
+    
+    The ETag is a hash of the response body, so it can never go stale; a
+    revalidated request still runs the view but skips sending the payload.
+    Apply below the auth decorator.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        response = make_response(f(*args, **kwargs))
+        if response.status_code == 200:
+            response.add_etag()
+            # Per-user data: the browser must revalidate, shared caches must not store it
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            response.make_conditional(request)
+        return response
+    
+    return decorated_function
@@ -0,0 +1,89 @@
+"""
+orjson-backed JSON for Flask responses and Socket.IO frames
+
+orjson encodes and parses in C and returns bytes directly, which matters on
+the hot paths: every jsonify() response and every signaling message
+(offers, answers, ICE candidates) during a video consultation.
+
+If orjson is not installed, both fall back to the standard library.
+"""
+import json
+from types import MappingProxyType
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that serializes with orjson
+
+    Output matches the default provider: keys are sorted, dates use the
+    HTTP date format (via DefaultJSONProvider.default) and debug mode
+    pretty-prints. MappingProxyType payloads are accepted as dicts. Calls
+    with unusual stdlib options (cls=..., etc.) are handed to the default
+    implementation.
+    """
+
+    @staticmethod
+    def default(o):
+        # Read-only module-level payloads (MappingProxyType) serialize as dicts
+        if isinstance(o, MappingProxyType):
+            return dict(o)
+        return DefaultJSONProvider.default(o)
+
+    def _option(self, indent: bool = False) -> int:
+        # Datetimes go through default() so they keep Flask's http_date format
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        indent = kwargs.pop('indent', None)
+        kwargs.pop('separators', None)
+        if orjson is None or kwargs:
+            if indent is not None:
+                kwargs['indent'] = indent
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._option(bool(indent))).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        option = self._option(indent) | orjson.OPT_APPEND_NEWLINE
+
+        # Bytes go straight into the response - no str round-trip
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option),
+            mimetype=self.mimetype
+        )
+
+
+class _OrjsonSocketIO:
+    """json-module stand-in for python-socketio (SocketIO(json=...))"""
+
+    @staticmethod
+    def dumps(obj, **kwargs):
+        # socketio passes separators=(',', ':') - orjson output is already compact
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    @staticmethod
+    def loads(s, **kwargs):
+        return orjson.loads(s)
+
+
+socketio_json = _OrjsonSocketIO if orjson is not None else json
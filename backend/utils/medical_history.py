@@ -2,7 +2,10 @@
 Medical History Timeline Utility Functions
 Append-only medical history tracking - replaces physical patient files
 """
-from models import Visit, PatientProfile, User, Prescription, LabTest
+from flask import g
+from sqlalchemy import case, distinct, func, select
+from sqlalchemy.orm import joinedload, selectinload
+from models import db, Visit, PatientProfile, User, Prescription, LabTest
 from datetime import datetime
 
 
@@ -75,7 +78,7 @@ def format_timeline_entry(visit, include_patient_info=False):
     return entry
 
 
-def get_patient_timeline(patient_profile_id, limit=None):
+def get_patient_timeline(patient_profile_id, limit=None, offset=0):
     """
     Get complete medical history timeline for a patient
     Ordered by date descending (newest first)
@@ -83,17 +86,25 @@ def get_patient_timeline(patient_profile_id, limit=None):
     Args:
         patient_profile_id: Patient profile ID
         limit: Optional limit on number of visits to return
+        offset: Number of (newest) visits to skip, for pagination
     
     Returns:
         list: Timeline entries
     """
-    query = Visit.query.filter_by(
+    query = Visit.query.options(
+        joinedload(Visit.doctor),
+        selectinload(Visit.prescriptions),
+        selectinload(Visit.lab_tests)
+    ).filter_by(
         patient_profile_id=patient_profile_id
-    ).order_by(Visit.visit_date.desc())
+    ).order_by(Visit.visit_date.desc(), Visit.id.desc())
     
     if limit:
         query = query.limit(limit)
     
+    if offset:
+        query = query.offset(offset)
+    
     visits = query.all()
     
     return [format_timeline_entry(visit) for visit in visits]
@@ -109,23 +120,15 @@ def get_patient_summary(patient_profile):
     Returns:
         dict: Patient summary
     """
-    total_visits = Visit.query.filter_by(
-        patient_profile_id=patient_profile.id
-    ).count()
-    
-    completed_visits = Visit.query.filter_by(
-        patient_profile_id=patient_profile.id,
-        status='completed'
-    ).count()
-    
-    # Get all unique doctors who treated this patient
-    visits_with_doctors = Visit.query.filter(
-        Visit.patient_profile_id == patient_profile.id,
-        Visit.doctor_id.isnot(None)
-    ).all()
-    
-    unique_doctor_ids = set([v.doctor_id for v in visits_with_doctors])
-    doctors_count = len(unique_doctor_ids)
+    # All three counts in one aggregate query - no visit rows are loaded
+    total_visits, completed_visits, doctors_count = db.session.execute(
+        select(
+            func.count(Visit.id),
+            func.count(case((Visit.status == 'completed', Visit.id))),
+            # Unique doctors who treated this patient (NULL doctor_id is not counted)
+            func.count(distinct(Visit.doctor_id))
+        ).where(Visit.patient_profile_id == patient_profile.id)
+    ).one()
     
     return {
         'profile_id': patient_profile.id,
@@ -236,10 +239,20 @@ def validate_doctor_access(doctor_id, patient_profile_id):
     
     Returns:
         bool: True if access granted
-    """
-    has_visit = Visit.query.filter_by(
-        doctor_id=doctor_id,
-        patient_profile_id=patient_profile_id
-    ).first()
     
-    return has_visit is not None
+    The answer is memoized on flask.g, so repeated checks for the same
+    doctor and patient within one request cost a single query.
+    """
+    memo = g.setdefault('_doctor_access', {})
+    key = (doctor_id, patient_profile_id)
+    if key not in memo:
+        # EXISTS - no visit row is loaded just to check for one
+        memo[key] = db.session.execute(
+            select(
+                select(Visit.id).where(
+                    Visit.doctor_id == doctor_id,
+                    Visit.patient_profile_id == patient_profile_id
+                ).exists()
+            )
+        ).scalar()
+    return memo[key]
@@ -82,7 +82,8 @@ def ai_chat():
                 'error': 'Gemini API key not configured'
             }), 500
         
-        genai.configure(api_key=api_key)
+        # REST, like the chatbot: configure() is global and gRPC would block the eventlet worker
+        genai.configure(api_key=api_key, transport='rest')
         
         # Step 3: Generate AI response using Gemini
         print(f"[Voice Assistant] User message: {user_message}")
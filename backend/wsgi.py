@@ -0,0 +1,19 @@
+"""
+WSGI entry point for running under gunicorn
+
+    gunicorn -k eventlet -w 1 --worker-connections 1000 -b 0.0.0.0:5000 wsgi:app
+
+One eventlet worker holds up to --worker-connections concurrent requests
+(chatbot calls waiting on Gemini, Socket.IO signaling) on greenlets, so a
+slow AI reply no longer blocks other users. That relies on all I/O going
+through patched sockets: Gemini is called over its REST transport and
+PostgreSQL through psycogreen (see create_app). Keep -w 1 unless a Socket.IO
+message queue and sticky sessions are configured - video signaling rooms
+live in the worker's memory.
+"""
+import os
+
+# app.py applies eventlet monkey patching before anything else is imported
+from app import create_app
+
+app, socketio = create_app(os.environ.get('FLASK_ENV', 'development'))